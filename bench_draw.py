@@ -0,0 +1,77 @@
+"""
+Microbenchmark for the draw() path of the GPU UI elements.
+
+Measures draw calls per second per element type (CPU side: Python overhead and
+SDL command queueing, the GPU work is flushed outside the timed loop) and the
+number of garbage collector runs the draws triggered.
+
+Usage: python bench_draw.py [draws per element]
+Headless: SDL_VIDEODRIVER=offscreen python bench_draw.py
+"""
+import gc
+import sys
+import time
+import pygame
+from pygame._sdl2 import Window, Renderer
+
+pygame.init()
+# A small window keeps the fill cost out of the numbers
+window = Window("bench_draw", (64, 64))
+renderer = Renderer(window)
+
+from ui.gpu_image import GPUImage
+from ui.gpu_polaroid import GPUPolaroid
+from ui.gpu_button import GPUImageButton
+
+DRAWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+FLUSH_EVERY = 500 # Draws queued before the renderer is flushed (not timed)
+
+
+def bench(name, element, animate=None):
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    elapsed = 0.0
+    done = 0
+    while done < DRAWS:
+        batch = min(FLUSH_EVERY, DRAWS - done)
+        start = time.perf_counter()
+        for i in range(batch):
+            if animate:
+                animate(element, done + i)
+            element.draw()
+        elapsed += time.perf_counter() - start
+        done += batch
+        renderer.present()
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    print(f"{name:<28} {DRAWS / elapsed:>10.0f} draws/s {elapsed / DRAWS * 1e6:>8.2f} us/draw {collections:>5} GC runs")
+
+
+def fade_and_zoom(image, i):
+    image.alpha = 255 - i % 256
+    image.scale = 1.0 + (i % 100) / 100
+
+
+def shrink(polaroid, i):
+    polaroid.set_scale(1.0 - (i % 60) / 100)
+
+
+def orbit(polaroid, i):
+    polaroid.set_transform((i % 300, i % 200), (i % 360) * 1.0)
+
+
+image = GPUImage(renderer, "assets/images/countdown_text_3.png")
+polaroid = GPUPolaroid(renderer, "assets/images/party-pic-1.png", size=300)
+icon_button = GPUImageButton(renderer, image_path="assets/images/icon-settings.png", size=(40, 40))
+text_button = GPUImageButton(renderer, text="Save & Apply", font=pygame.font.Font(None, 24), border_radius=10)
+text_button.bg_color = (50, 150, 50, 255)
+
+print(f"{DRAWS} draws per element")
+bench("GPUImage static", image)
+bench("GPUImage fade + zoom", image, fade_and_zoom)
+bench("GPUPolaroid static", polaroid)
+bench("GPUPolaroid shrinking", polaroid, shrink)
+bench("GPUPolaroid orbiting", polaroid, orbit)
+bench("GPUImageButton image", icon_button)
+bench("GPUImageButton text", text_button)
+
+pygame.quit()
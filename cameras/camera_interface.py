@@ -1,12 +1,33 @@
 from abc import ABC, abstractmethod
+import pygame
 from PIL import Image
 
+# Posted by the capture threads whenever a new live view frame is available,
+# so an idle main loop wakes up to show it.
+CAMERA_FRAME_EVENT = pygame.event.custom_type()
+
+
+def notify_new_frame():
+    """Posts a CAMERA_FRAME_EVENT (safe to call from any thread)."""
+    try:
+        pygame.event.post(pygame.event.Event(CAMERA_FRAME_EVENT))
+    except pygame.error:
+        # Event system not initialized (yet) or queue full, the next frame retries
+        pass
+
 class CameraInterface(ABC):
     """
     Abstract base class for camera implementations.
     Defines the interface for both threaded (handler) and blocking cameras.
     """
 
+    # Fraction of the full live view resolution frames are decoded at
+    preview_scale = 1.0
+
+    def set_preview_scale(self, scale):
+        """Lowers the live view resolution (e.g. under load). Photos are unaffected."""
+        self.preview_scale = max(0.125, min(1.0, float(scale)))
+
     @abstractmethod
     def start_continuous(self):
         """Starts the continuous capture thread (Live View)."""
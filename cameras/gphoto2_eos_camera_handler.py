@@ -5,9 +5,7 @@ import subprocess
 import gphoto2 as gp
 from PIL import Image
 
-from .camera_interface import CameraInterface
-
-from .camera_interface import CameraInterface
+from .camera_interface import CameraInterface, notify_new_frame
 from utils.logger import get_logger
 
 logger = get_logger("GPhoto2Handler")
@@ -124,6 +122,7 @@ class GPhoto2EOSCameraHandler(CameraInterface, threading.Thread):
                     # Safely store the received image
                     with self.image_lock:
                         self.latest_image = image
+                    notify_new_frame()
                 
                 # Add a small pause to relieve CPU
                 # and give camera breathing room (can be removed if needed)
@@ -217,7 +216,7 @@ class GPhoto2EOSCameraHandler(CameraInterface, threading.Thread):
         # Requests a preview frame
         try:
             _, camera_file = gp.gp_camera_capture_preview(self.camera)
-            return self._send_file(camera_file)
+            return self._send_file(camera_file, self.preview_scale)
         except gp.GPhoto2Error as e:
              logger.error(f'Error requesting preview: {e}')
              # Turn off Live View on error
@@ -237,13 +236,16 @@ class GPhoto2EOSCameraHandler(CameraInterface, threading.Thread):
             logger.error(f'Error taking photo: {e}')
             return None
 
-    def _send_file(self, camera_file):
+    def _send_file(self, camera_file, scale=1.0):
         """
         Processes binary camera data and returns a PIL Image object.
+        With scale < 1 JPEGs are decoded at reduced size (1/2, 1/4 or 1/8).
         """
         file_data = camera_file.get_data_and_size()
         try:
             image = Image.open(io.BytesIO(file_data))
+            if scale < 1.0:
+                image.draft("RGB", (int(image.width * scale), int(image.height * scale)))
             # Image.load() is needed to process data in thread before releasing lock
             image.load() 
             return image
@@ -2,7 +2,7 @@ import threading
 import time
 import cv2
 from PIL import Image
-from .camera_interface import CameraInterface
+from .camera_interface import CameraInterface, notify_new_frame
 from utils.logger import get_logger
 
 logger = get_logger("WebcamHandler")
@@ -39,6 +39,9 @@ class WebcamCameraHandler(CameraInterface, threading.Thread):
                 ret, frame = self.camera.read()
                 
                 if ret:
+                    if self.preview_scale < 1.0:
+                        frame = cv2.resize(frame, None, fx=self.preview_scale, fy=self.preview_scale,
+                                           interpolation=cv2.INTER_AREA)
                     # Convert BGR (OpenCV) to RGB (PIL)
                     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                     image = Image.fromarray(frame_rgb)
@@ -46,6 +49,7 @@ class WebcamCameraHandler(CameraInterface, threading.Thread):
                     # Safely store the received image
                     with self.image_lock:
                         self.latest_image = image
+                    notify_new_frame()
                 
                 # Add a small pause to relieve CPU
                 time.sleep(0.01) 
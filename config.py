@@ -3,6 +3,7 @@ from utils.font_utils import FontUtils
 
 VERSION = "1.0"
 PHOTO_FOLDER = "photos"
+ASSET_CACHE_FOLDER = "cache/assets"
 FPS = 60
 
 FONT_DISPLAY = FontUtils.load_font('assets/fonts/Pacifico-Regular.ttf', 20)
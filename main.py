@@ -2,14 +2,27 @@ import sys
 import pygame
 import faulthandler
 from pygame._sdl2 import Window, Renderer, Texture
+from cameras.camera_interface import CAMERA_FRAME_EVENT
 
 from screens.countdown_screen import CountdownScreen
 from screens.screen_manager import ScreenManager
 from screens.main_screen import MainScreen
 from screens.settings_screen import SettingsScreen
 from screens.photo_screen import PhotoScreen
+from ui.asset_preloader import AssetPreloader
 from ui.gpu_image import GPUImage
+from ui.render_target import ScaledCanvas
+from ui.texture_cache import get_texture_cache
+from utils.color_filters import get_color_filter
+from utils.frame_scheduler import get_frame_scheduler
+from utils.photo_store import get_photo_store
+from utils.photo_writer import get_photo_writer
+from utils.photo_storage import create_photo_storage
+from utils.rendition_pipeline import get_rendition_pipeline
+from utils.print_spooler import create_printer, get_print_spooler
+from utils.strip_compositor import get_strip_compositor
 from utils.logger import get_logger
+from utils.quality_governor import get_quality_governor
 from utils.settings_manager import SettingsManager
 
 logger = get_logger("Main")
@@ -19,23 +32,33 @@ faulthandler.enable()
 
 # Configuration
 APP_TITLE = "Loomo Photobooth"
-FPS = 60
+IDLE_HEARTBEAT_MS = 1000 # Redraw interval while nothing on screen changes
+MAX_FRAME_DT = 0.1 # Clamp for dt, e.g. the first frame after idling (seconds)
+PRINT_SHUTDOWN_TIMEOUT = 10.0 # Seconds to wait for queued prints on exit
 
 # Global State
 camera = None
 manager = None
 settings_manager = None
+scheduler = None
+canvas = None
 window = None
 renderer = None
 screen_width = 1280
 screen_height = 800
 current_is_fullscreen = False
+current_camera_type = None
+current_printer_settings = None
+
+# Screens whose assets are preloaded; the settings screen is rarely opened and loads on demand
+PRELOADED_SCREENS = (MainScreen, CountdownScreen, PhotoScreen)
 
 def init_camera():
     """Initializes the camera based on settings."""
-    global camera, settings_manager
+    global camera, settings_manager, current_camera_type
     
     cam_type = settings_manager.get("camera_type", "webcam")
+    current_camera_type = cam_type
     logger.info(f"Initializing camera type: {cam_type}")
     
     # Teardown existing
@@ -63,9 +86,32 @@ def init_camera():
         camera = WebcamCameraHandler(camera_index=0)
 
     # Start
+    camera.set_preview_scale(get_quality_governor().get("preview_scale"))
     camera.start_continuous()
     return camera
 
+def apply_print_settings():
+    """(Re)creates the print backend the settings select, if they changed."""
+    global current_printer_settings
+    spooler = get_print_spooler()
+    spooler.copies = int(settings_manager.get("print_copies", 1))
+    printer_settings = tuple(settings_manager.get(key, "") for key in ("printer_type", "printer_name", "print_dir"))
+    if printer_settings == current_printer_settings:
+        return
+    current_printer_settings = printer_settings
+    spooler.set_printer(create_printer(settings_manager))
+    if spooler.printer:
+        logger.info(f"Printing to '{spooler.printer.name}' printer ({spooler.printer.page_size[0]}x{spooler.printer.page_size[1]} in, {spooler.printer.dpi} dpi).")
+
+def apply_quality(governor):
+    """Quality governor listener: pushes the lever values to the components using them."""
+    if canvas:
+        canvas.set_scale(governor.get("render_scale"))
+    if scheduler:
+        scheduler.set_frame_rate(governor.get("frame_rate"))
+    if camera:
+        camera.set_preview_scale(governor.get("preview_scale"))
+
 def parse_resolution(res_str):
     if res_str.lower() == "fullscreen":
         # Get native display size
@@ -78,20 +124,46 @@ def parse_resolution(res_str):
     except:
         return 1280, 800, False
 
-def init_screens(renderer, width, height, camera, settings_mgr, cb):
-    """Initializes and registers all screens."""
-    mgr = ScreenManager()
-    
-    main_screen = MainScreen(renderer, width, height)
-    countdown_screen = CountdownScreen(renderer, width, height, camera)
-    settings_screen = SettingsScreen(renderer, width, height, settings_mgr, cb)
-    
-    photo_screen = PhotoScreen(renderer, width, height, camera)
+def preload_assets(renderer, width, height, on_progress=None, screen_classes=PRELOADED_SCREENS):
+    """Decodes the assets of the given screens in parallel and uploads them to the texture cache."""
+    specs = []
+    for screen_cls in screen_classes:
+        specs.extend(screen_cls.asset_manifest(width, height))
+
+    preloader = AssetPreloader(get_texture_cache(renderer), specs)
+    preloader.wait(on_progress)
+
+def init_screens():
+    """
+    Registers all screens. They are constructed on first use from the current
+    globals, and rebuilt after settings changes they depend on.
+    """
+    mgr = ScreenManager(scheduler)
     
-    mgr.add_screen('main', main_screen)
-    mgr.add_screen('countdown', countdown_screen)
-    mgr.add_screen('settings', settings_screen)
-    mgr.add_screen('photo', photo_screen)
+    mgr.add_screen_factory(
+        'main',
+        lambda: MainScreen(
+            renderer, screen_width, screen_height,
+            orbit_mode=settings_manager.get("orbit_mode", "ring"),
+            live_gallery=settings_manager.get("live_gallery", True)
+        ),
+        depends_on=('resolution',)
+    )
+    mgr.add_screen_factory(
+        'countdown',
+        lambda: CountdownScreen(renderer, screen_width, screen_height, camera),
+        depends_on=('resolution', 'camera')
+    )
+    mgr.add_screen_factory(
+        'settings',
+        lambda: SettingsScreen(renderer, screen_width, screen_height, settings_manager, apply_settings_callback),
+        depends_on=('resolution',)
+    )
+    mgr.add_screen_factory(
+        'photo',
+        lambda: PhotoScreen(renderer, screen_width, screen_height, camera),
+        depends_on=('resolution', 'camera')
+    )
     
     mgr.set_initial_screen('main')
     return mgr
@@ -101,9 +173,12 @@ def apply_settings_callback():
     global camera, manager, renderer, screen_width, screen_height, settings_manager, window, current_is_fullscreen
     
     logger.info("Applying new settings...")
+    changes = set()
     
-    # 1. Update Camera
-    camera = init_camera()
+    # 1. Update Camera (only if the type changed, re-opening a DSLR takes seconds)
+    if settings_manager.get("camera_type", "webcam") != current_camera_type:
+        camera = init_camera()
+        changes.add('camera')
     
     # 2. Update Resolution
     new_res_str = settings_manager.get("screen_size", "1280x800")
@@ -113,6 +188,7 @@ def apply_settings_callback():
     
     if res_changed or is_fullscreen != current_is_fullscreen:
         logger.info(f"Resolution changed to {new_w}x{new_h} (Fullscreen: {is_fullscreen}). Updating window...")
+        changes.add('resolution')
         screen_width = new_w
         screen_height = new_h
         
@@ -137,15 +213,31 @@ def apply_settings_callback():
         except Exception as e:
              logger.error(f"Failed to resize window: {e}")
              
-    # 3. Re-init Screens (Layout depends on W/H)
-    logger.info("Recreating screen layouts...")
+    # 3. Render resolution and quality limits (cheap, applied directly)
+    if canvas:
+        canvas.resize((screen_width, screen_height))
+    get_quality_governor().configure(settings_manager)
+    get_texture_cache(renderer).budget = int(settings_manager.get("texture_budget_mb", 256)) * 2**20
+    get_photo_writer().fsync = bool(settings_manager.get("photo_fsync", True))
+    get_photo_writer().max_queue_bytes = int(settings_manager.get("photo_queue_mb", 384)) * 2**20
+    get_strip_compositor().layout = settings_manager.get("photo_strip_layout") or None
+    get_color_filter().set_look(settings_manager.get("color_filter", ""))
+    apply_print_settings()
+
+    # 4. Rebuild only the screens affected by what changed (lazily, on next use)
+    if not changes:
+        logger.info("No changes affecting screens.")
+        return
+
     try:
-        manager = init_screens(renderer, screen_width, screen_height, camera, settings_manager, apply_settings_callback)
+        if 'resolution' in changes:
+            preload_assets(renderer, screen_width, screen_height)
+        manager.invalidate(changes)
     except Exception as e:
         logger.error(f"Failed to re-init screens: {e}")
 
 def main():
-    global camera, manager, settings_manager, renderer, screen_width, screen_height, window, current_is_fullscreen
+    global camera, manager, settings_manager, scheduler, canvas, renderer, screen_width, screen_height, window, current_is_fullscreen
 
     # 1. Initialize Pygame
     pygame.init()
@@ -170,17 +262,47 @@ def main():
     
     # Create Renderer (Hardware Accelerated)
     renderer = Renderer(window, vsync=True)
+    # Texture memory budget (the Pi's GPU shares system RAM)
+    texture_cache = get_texture_cache(renderer)
+    texture_cache.budget = int(settings_manager.get("texture_budget_mb", 256)) * 2**20
+    photo_writer = get_photo_writer()
+    photo_writer.fsync = bool(settings_manager.get("photo_fsync", True))
+    photo_writer.max_queue_bytes = int(settings_manager.get("photo_queue_mb", 384)) * 2**20
+    # Stage new photos in RAM, moved to the card between sessions
+    photo_writer.storage = create_photo_storage(settings_manager)
+    # Photo index: opened here, before screens and their threads use it
+    get_photo_store()
+    get_color_filter().set_look(settings_manager.get("color_filter", ""))
+    # Photo strips render in worker processes, spawned now rather than after the first session
+    compositor = get_strip_compositor()
+    compositor.layout = settings_manager.get("photo_strip_layout") or None
+    if compositor.layout:
+        compositor.start()
+    apply_print_settings()
+
+    # Screens render at 'render_scale' of the window resolution, upscaled on present
+    canvas = ScaledCanvas(renderer, (screen_width, screen_height), settings_manager.get("render_scale", 1.0))
+    logger.info(f"Render scale {canvas.scale:.2f}")
+    scheduler = get_frame_scheduler()
+    refresh_rate = scheduler.refresh_rate
+    logger.info(f"Frame budget {1000 / refresh_rate:.1f} ms ({refresh_rate} Hz)")
+
+    # Steps quality down (and back up) with the measured frame times
+    governor = get_quality_governor()
+    governor.add_listener(apply_quality)
+    governor.configure(settings_manager, frame_rate=refresh_rate)
     
     logger.info("Renderer created. Showing loading screen...")
     
     # 3. Show Loading Screen (Renderer Version)
+    bg = None
+    logo = None
     try:
         renderer.draw_color = (0, 0, 0, 255)
         renderer.clear()
         
         # Load Background
-        bg = GPUImage(renderer, "assets/images/background-loading.png")
-        bg.resize(screen_width, screen_height)
+        bg = GPUImage(renderer, "assets/images/background-loading.png", size=(screen_width, screen_height))
         bg.draw()
         
         renderer.present()
@@ -210,49 +332,131 @@ def main():
     except Exception as e:
         logger.warn(f"Warning: Could not show loading screen: {e}")
 
+    def draw_loading_progress(progress):
+        """Redraws the loading screen with a progress bar along the bottom."""
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+        if bg:
+            bg.draw()
+        if logo:
+            logo.draw()
+
+        bar_h = max(4, screen_height // 100)
+        bar_y = screen_height - 4 * bar_h
+        bar_x = screen_width // 5
+        bar_w = screen_width - 2 * bar_x
+        renderer.draw_color = (90, 90, 90, 255)
+        renderer.fill_rect(pygame.Rect(bar_x, bar_y, bar_w, bar_h))
+        renderer.draw_color = (255, 255, 255, 255)
+        renderer.fill_rect(pygame.Rect(bar_x, bar_y, int(bar_w * progress), bar_h))
 
-    # 5. Initialize Camera
+        renderer.present()
+        pygame.event.pump()
+
+    # 5. Decode all screen assets in parallel (progress on the loading screen)
+    try:
+        preload_assets(renderer, screen_width, screen_height, draw_loading_progress)
+    except Exception as e:
+        logger.warn(f"Asset preloading failed, screens will load on demand: {e}")
+
+    # 5b. Initialize Camera
     init_camera()
 
     # 6. Initialize Screens & Manager
     try:
-        manager = init_screens(renderer, screen_width, screen_height, camera, settings_manager, apply_settings_callback)
+        manager = init_screens()
         
     except Exception as e:
         logger.fatal(f"Error initializing screens: {e}", exc_info=True)
         sys.exit(1)
 
+    # Loading screen images are no longer needed
+    for img in (bg, logo):
+        if img:
+            img.cleanup()
+
     # 7. Main Game Loop
-    clock = pygame.time.Clock()
+    # Paced by vsync in present(); the scheduler checks each frame against the refresh interval
     running = True
+    idle = False # Last frame was skipped, block until something happens
+    last_present = pygame.time.get_ticks()
+    camera_wakeups = None # Whether CAMERA_FRAME_EVENTs are let into the queue
     
     while running:
-        dt = clock.tick(FPS) / 1000.0
+        # Camera frames only matter to screens showing the live view; elsewhere they
+        # are dropped by SDL, so static screens sleep until input or the heartbeat
+        live = manager.shows_live_preview()
+        if live != camera_wakeups:
+            camera_wakeups = live
+            if live:
+                pygame.event.set_allowed(CAMERA_FRAME_EVENT)
+            else:
+                pygame.event.set_blocked(CAMERA_FRAME_EVENT)
+
+        events = []
+        if idle:
+            # Input, camera frames (live view screens only) or the heartbeat wake us up
+            first = pygame.event.wait(IDLE_HEARTBEAT_MS)
+            if first.type != pygame.NOEVENT:
+                events.append(first)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
+        dt = min(scheduler.begin_frame(), MAX_FRAME_DT)
+
+        force_redraw = False
+        with scheduler.phase("event", manager.current_name):
+            events += pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
                     running = False
-            
-            manager.handle_event(event)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESIZED, pygame.WINDOWRESTORED):
+                    # The window contents were lost
+                    force_redraw = True
+                
+                manager.handle_event(event)
 
         manager.update(dt)
+
+        heartbeat = pygame.time.get_ticks() - last_present >= IDLE_HEARTBEAT_MS
+        if not (force_redraw or heartbeat or manager.needs_redraw()):
+            # Nothing changed: keep the last frame on screen and let GPU/CPU idle
+            scheduler.end_frame(presented=False)
+            idle = True
+            continue
+        idle = False
         
         # DRAW Call - Pass Renderer if needed, but screens have it stored.
         # MainScreen.draw now takes renderer as arg.
-        manager.draw(renderer) 
+        with canvas.frame():
+            manager.draw(renderer) 
         
-        # Present the frame
-        renderer.present()
+        # Present the frame (blocks until vblank)
+        with scheduler.phase("present"):
+            renderer.present()
+        last_present = pygame.time.get_ticks()
+        scheduler.end_frame()
+        governor.observe(scheduler.last_missed, scheduler.last_busy / scheduler.budget)
+        texture_cache.end_frame()
         
     # 8. Cleanup
     logger.info("Application closing...")
+    scheduler.report()
+    texture_cache.report()
     manager.exit()
     if camera:
         logger.info("Shutting down camera...")
         camera.shut_down()
+    # Don't lose photos still being written (renditions queue more writes)
+    get_strip_compositor().shutdown()
+    # Printing can take minutes, unprinted pages are logged
+    get_print_spooler().shutdown(timeout=PRINT_SHUTDOWN_TIMEOUT)
+    get_rendition_pipeline().shutdown()
+    photo_writer.shutdown()
+    get_photo_store().close()
+    if photo_writer.storage:
+        photo_writer.storage.close()
         
     # Window/Renderer cleanup is automatic on quit
     pygame.quit()
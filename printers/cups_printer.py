@@ -0,0 +1,86 @@
+import re
+import subprocess
+import time
+
+from .printer_interface import PrinterInterface
+from utils.logger import get_logger
+
+logger = get_logger("CupsPrinter")
+
+
+class CupsPrinter(PrinterInterface):
+    """
+    Prints through CUPS with the 'lp' command (e.g. a dye-sub photo printer).
+
+    wait_page() waits until CUPS reports the job completed, so only one page
+    is at the printer at a time and the spooler's queue (and ETAs) stay
+    accurate instead of everything piling up in the CUPS queue.
+    """
+
+    name = "cups"
+    POLL_INTERVAL = 2.0 # Seconds between job status checks
+    TIMEOUT = 600.0 # Seconds a page may take (e.g. paper to be refilled)
+
+    def __init__(self, printer_name=None, dpi=300, page_size=(4, 6), seconds_per_page=60.0, options=None):
+        self.printer_name = printer_name or None # None: the CUPS default printer
+        self.dpi = dpi
+        self.page_size = page_size
+        self.seconds_per_page = seconds_per_page
+        # Pages are rasterized to the paper size, don't let the driver scale them again
+        self.options = {"print-scaling": "none"} if options is None else options
+
+    def _destination(self):
+        return ["-d", self.printer_name] if self.printer_name else []
+
+    def is_ready(self):
+        try:
+            result = subprocess.run(
+                ["lpstat", "-p"] + ([self.printer_name] if self.printer_name else []),
+                capture_output=True, text=True, timeout=10
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0 and "disabled" not in result.stdout
+
+    def submit_page(self, path, copies=1):
+        """Queues the page with 'lp'. Returns the CUPS request ID (None if lp didn't report one)."""
+        command = ["lp", "-n", str(copies)] + self._destination()
+        for key, value in self.options.items():
+            command += ["-o", f"{key}={value}"]
+        command.append(path)
+
+        result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            raise RuntimeError(f"lp failed: {result.stderr.strip() or result.returncode}")
+
+        match = re.search(r"request id is (\S+)", result.stdout)
+        if match is None:
+            logger.warn(f"Unexpected lp output, not waiting for the job: {result.stdout.strip()}")
+            return None
+        return match.group(1)
+
+    def wait_page(self, request_id):
+        """Blocks until the CUPS job is no longer pending or printing."""
+        if request_id is None:
+            return
+        deadline = time.monotonic() + self.TIMEOUT
+        warned = False
+        while time.monotonic() < deadline:
+            try:
+                result = subprocess.run(
+                    ["lpstat", "-W", "not-completed", "-o"] + ([self.printer_name] if self.printer_name else []),
+                    capture_output=True, text=True, timeout=10
+                )
+                error = None if result.returncode == 0 else result.stderr.strip() or result.returncode
+            except (OSError, subprocess.TimeoutExpired) as e:
+                error = e
+            if error is None:
+                pending = [line.split()[0] for line in result.stdout.splitlines() if line.strip()]
+                if request_id not in pending:
+                    return
+            elif not warned:
+                # Unknown status is not completion, keep polling
+                logger.warn(f"lpstat failed while waiting for print job {request_id}: {error}")
+                warned = True
+            time.sleep(self.POLL_INTERVAL)
+        raise RuntimeError(f"Print job {request_id} did not complete within {self.TIMEOUT:.0f} s")
@@ -0,0 +1,44 @@
+import os
+import shutil
+import threading
+import time
+
+from .printer_interface import PrinterInterface
+from utils.logger import get_logger
+
+logger = get_logger("FileSinkPrinter")
+
+
+class FileSinkPrinter(PrinterInterface):
+    """
+    Stands in for a printer: every printed copy is written to 'directory'
+    (numbered, complete files only). 'seconds_per_page' simulates the
+    printer's speed, so queueing and ETAs behave as with real hardware.
+    """
+
+    name = "file"
+
+    def __init__(self, directory="prints", dpi=300, page_size=(4, 6), seconds_per_page=0.0):
+        self.directory = directory
+        self.dpi = dpi
+        self.page_size = page_size
+        self.seconds_per_page = seconds_per_page
+        self._count = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def submit_page(self, path, copies=1):
+        for _ in range(copies):
+            with self._lock:
+                self._count += 1
+                number = self._count
+            target = os.path.join(self.directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{number:04d}_{os.path.basename(path)}")
+            temp_path = target + ".part"
+            shutil.copyfile(path, temp_path)
+            os.replace(temp_path, target)
+            logger.info(f"Printed to {target}")
+        return copies
+
+    def wait_page(self, copies):
+        if self.seconds_per_page:
+            time.sleep(self.seconds_per_page * copies)
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+
+
+class PrinterInterface(ABC):
+    """
+    Abstract base class for print backends.
+
+    The PrintSpooler rasterizes pages to 'page_pixels' (page size at 'dpi')
+    before handing them to the backend, so backends send them as they are.
+    Printing is split in two so the spooler knows what is safe to retry:
+    submit_page() hands the page over, wait_page() waits until it is out.
+    """
+
+    name = "printer"
+    dpi = 300
+    page_size = (4, 6) # Inches (width, height) of the paper
+    seconds_per_page = 60.0 # Initial estimate for ETAs, refined with measured prints
+
+    @property
+    def page_pixels(self):
+        """Paper size in pixels at the printer's resolution."""
+        return (int(round(self.page_size[0] * self.dpi)), int(round(self.page_size[1] * self.dpi)))
+
+    def is_ready(self):
+        """Whether the printer can take a page now (e.g. connected, has paper)."""
+        return True
+
+    @abstractmethod
+    def submit_page(self, path, copies=1):
+        """
+        Hands a rasterized page to the printer and returns a handle for
+        wait_page(). Raises if the printer did not take it: nothing was
+        printed, so the page can be sent again.
+        """
+        pass
+
+    def wait_page(self, handle):
+        """
+        Blocks until a submitted page is printed (so the spooler knows when
+        to send the next one). Raises if it failed or took too long; the
+        printer has the page, so it must not be sent again.
+        """
+        pass
+
+    def print_page(self, path, copies=1):
+        """Prints a rasterized page, blocking until it is out. Raises on failure."""
+        self.wait_page(self.submit_page(path, copies))
+
+    def shut_down(self):
+        """Releases the printer."""
+        pass
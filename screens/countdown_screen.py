@@ -8,12 +8,24 @@ from screens.screen_interface import ScreenInterface
 from utils.logger import get_logger
 from ui.gpu_image import GPUImage
 from ui.live_preview import LivePreview
+from utils.photo_store import get_photo_store
 
 logger = get_logger("CountdownScreen")
 
 
 class CountdownScreen(ScreenInterface):
-    
+
+    shows_live_preview = True
+
+    OVERLAY_PATH = "assets/images/preview-border.png"
+    COUNTDOWN_PATHS = {
+        'ready': "assets/images/countdown_text_ready.png",
+        'text_3': "assets/images/countdown_text_3.png",
+        'text_2': "assets/images/countdown_text_2.png",
+        'text_1': "assets/images/countdown_text_1.png",
+        'smile': "assets/images/countdown_text_smile.png",
+    }
+
     def __init__(self, renderer, width, height, camera):
         self.renderer = renderer
         self.width = width
@@ -22,26 +34,22 @@ class CountdownScreen(ScreenInterface):
         self.preview = LivePreview(renderer, width, height)
         self.polaroids_list = [] # From previous shots
         self.photo_index = 1
+        self.session_id = None # See PhotoStore
         
         # Sizing factor calculation
         self.sizing_factor = width / 1280
         
         # Load Overlay
-        self.overlay = GPUImage(renderer, "assets/images/preview-border.png")
         margin = int(10 * self.sizing_factor)
         overlay_width = self.width - (2 * margin)
         overlay_height = self.height - (2 * margin)
-        self.overlay.resize(overlay_width, overlay_height)
+        self.overlay = GPUImage(renderer, self.OVERLAY_PATH, size=(overlay_width, overlay_height))
         self.overlay.set_position((margin, margin))
         
         # Countdown Images
         # We quote 'ready' to fix the NameError.
         self.countdown_images = {
-            'ready': GPUImage(renderer, "assets/images/countdown_text_ready.png"),
-            'text_3': GPUImage(renderer, "assets/images/countdown_text_3.png"),
-            'text_2': GPUImage(renderer, "assets/images/countdown_text_2.png"),
-            'text_1': GPUImage(renderer, "assets/images/countdown_text_1.png"),
-            'smile': GPUImage(renderer, "assets/images/countdown_text_smile.png")
+            name: GPUImage(renderer, path) for name, path in self.COUNTDOWN_PATHS.items()
         }
         
         # Resize and position all elements
@@ -56,9 +64,24 @@ class CountdownScreen(ScreenInterface):
         self.current_number = None
         self.elapsed_time = 0.0
 
+    @staticmethod
+    def asset_manifest(width, height):
+        margin = int(10 * (width / 1280))
+        overlay_size = (width - (2 * margin), height - (2 * margin))
+        specs = [(CountdownScreen.OVERLAY_PATH, overlay_size, 'smoothscale')]
+        # Countdown texts are scaled relative to their original size, decode the originals
+        specs.extend((path, None, None) for path in CountdownScreen.COUNTDOWN_PATHS.values())
+        return specs
+
     def handle_event(self, event, switch_screen_callback):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
+                # Session aborted, its polaroids aren't passed on
+                for p in self.polaroids_list:
+                    p.cleanup()
+                self.polaroids_list = []
+                get_photo_store().end_session(self.session_id, 'aborted')
+                self.session_id = None
                 switch_screen_callback('main')
     
     def update(self, dt, callback):
@@ -111,7 +134,7 @@ class CountdownScreen(ScreenInterface):
         else:
             # Animation finished, move to capturing phase
             # Pass persistence data
-            callback('photo', photo_index=self.photo_index, polaroids=self.polaroids_list)
+            callback('photo', photo_index=self.photo_index, polaroids=self.polaroids_list, session_id=self.session_id)
 
     def draw(self, renderer):
         # Clear back buffer
@@ -150,7 +173,18 @@ class CountdownScreen(ScreenInterface):
         # Context Data
         self.photo_index = context_data.get('photo_index', 1)
         self.polaroids_list = context_data.get('polaroids', [])
+        # The first countdown starts a new session, later ones continue it
+        self.session_id = context_data.get('session_id') or get_photo_store().begin_session()
         
     def on_exit(self):
         logger.info("Exiting CountdownScreen.")
-        pass
\ No newline at end of file
+        pass
+
+    def cleanup(self):
+        self.overlay.cleanup()
+        for img in self.countdown_images.values():
+            img.cleanup()
+        for p in self.polaroids_list:
+            p.cleanup()
+        self.polaroids_list = []
+        self.preview.release()
\ No newline at end of file
@@ -1,23 +1,50 @@
 import random
+import time
 import pygame
 import pygame.font
-import math
 import numpy as np
 
 from config import *
 from ui.gpu_image import GPUImage
 from ui.gpu_polaroid import GPUPolaroid
 from ui.gpu_text_label import GPUTextLabel
+from ui.photo_gallery import PhotoGallery
+from ui.render_target import create_render_target, render_to
+from ui.static_layer import StaticLayer
+from ui.texture_cache import get_texture_cache
 from .screen_interface import ScreenInterface
+from utils.frame_scheduler import get_frame_scheduler
 from utils.logger import get_logger
+from utils.quality_governor import get_quality_governor
 
 logger = get_logger("MainScreen")
 
 
 class MainScreen(ScreenInterface):
-    """The main photobooth screen using hardware-accelerated SDL2 Renderer."""
-    
-    def __init__(self, renderer, width, height):
+    """
+    The main photobooth screen using hardware-accelerated SDL2 Renderer.
+
+    With the live gallery, orbit polaroids show the latest captures instead of
+    the party pictures: whenever a gallery photo is ready, the hidden slot that
+    comes into view next gets it (at most one swap per SWAP_INTERVAL). A swap
+    is spread over frames, see update_gallery().
+    """
+
+    BACKGROUND_PATH = "assets/images/background-image.png"
+    PRESS_TO_START_PATH = "assets/images/button_press-to-start.png"
+    TAKE_PHOTO_PATH = "assets/images/button_take-photo.png"
+    SETTINGS_ICON_PATH = "assets/images/icon-settings.png"
+    PARTY_PIC_PATHS = [f"assets/images/party-pic-{n}.png" for n in range(1, 6)]
+
+    # Orbit modes: 'ring' bakes all polaroids into one texture that is rotated as a whole,
+    # 'individual' draws every polaroid separately each frame.
+    ORBIT_MODES = ('ring', 'individual')
+    MAX_RING_TEXTURE_SIZE = 4096 # Larger rings are baked at reduced resolution
+    SWAP_INTERVAL = 1.0 # Seconds between gallery photo swaps
+    SWAP_MAX_DEFER = 0.5 # Seconds a swap step waits for a frame with room for it
+    SWAP_SMOOTHING = 0.3 # Weight of the newest measurement in the step cost averages
+
+    def __init__(self, renderer, width, height, orbit_mode='ring', live_gallery=True):
         self.renderer = renderer
         self.width = width
         self.height = height
@@ -25,9 +52,11 @@ class MainScreen(ScreenInterface):
         self.aspect_ratio = width / height
 
         # --- INSTANCE OF BACKGROUND ---
-        self.background_image = GPUImage(renderer, image_path="assets/images/background-image.png", position=(0, 0)) 
-        # Resize background to fit screen
-        self.background_image.resize(self.width, self.height)
+        # Loaded at screen size (shared through the texture cache)
+        self.background_image = GPUImage(
+            renderer, image_path=self.BACKGROUND_PATH, position=(0, 0),
+            size=(self.width, self.height)
+        )
         
         # --- INSTANCE OF TEXT LABEL ---
         self.fps_label = GPUTextLabel(renderer, initial_text="Starting...", font=FONT_MONO, color=(0, 0, 0))
@@ -44,20 +73,53 @@ class MainScreen(ScreenInterface):
         self.center_y = self.height + 900 
         self.orbit_radius = 1400         
 
+        self.polaroid_angle_offsets = []
+        self.polaroid_rotation_offsets = []
+
         for i in range(NUM_POLAROIDS):
-            picture_number = i % 5
-            polaroid = GPUPolaroid(renderer, photo_path=f"assets/images/party-pic-{picture_number + 1}.png", size=300 * self.sizing_factor)
-            polaroid.angle_offset = i * self.angle_offset_step
-            polaroid.rotation_offset = random.randint(-10, 10) 
+            picture_number = i % len(self.PARTY_PIC_PATHS)
+            polaroid = GPUPolaroid(renderer, photo_path=self.PARTY_PIC_PATHS[picture_number], size=300 * self.sizing_factor)
+            self.polaroid_angle_offsets.append(i * self.angle_offset_step)
+            self.polaroid_rotation_offsets.append(random.randint(-10, 10))
             
             polaroid.set_position((0, 0))
             polaroid.set_rotation(0) 
             self.polaroids.append(polaroid)
 
+        # Live gallery: recent captures streamed into hidden orbit slots
+        polaroid_size = int(300 * self.sizing_factor)
+        self.gallery = PhotoGallery(renderer, polaroid_size) if live_gallery else None
+        self.slot_swapped = [False] * NUM_POLAROIDS # Swapped since the slot was last on screen
+        self.slot_paths = [None] * NUM_POLAROIDS # Gallery photo per slot (None: party picture)
+        self.swap_timer = 0.0
+        # Swap in progress: its slot and photo, the steps left and how long the next one waited
+        self.swap_slot = None
+        self.swap_path = None
+        self.swap_steps = []
+        self.swap_waited = 0.0
+        self.swap_costs = {'bake': 0.005, 'ring': 0.010} # Seconds per step, measured
+
+        # Polaroids shown on the orbit (evenly spread subset under load, see quality governor)
+        self.visible_polaroids = list(self.polaroids)
+        self.visible_indices = list(range(NUM_POLAROIDS))
+
+        # Orbit state as arrays, the layout is computed in one vectorized pass per frame
+        self._build_orbit_arrays()
+
+        # Whole-ring render target (baked on first draw)
+        if orbit_mode not in self.ORBIT_MODES:
+            logger.warn(f"Unknown orbit mode '{orbit_mode}', using 'ring'.")
+            orbit_mode = 'ring'
+        self.orbit_mode = orbit_mode
+        self.update_orbit_lever()
+        self.ring_texture = None
+        self.ring_extent = 0 # Distance from orbit center to the ring texture edge (screen px)
+        self.ring_dirty = True
+
         # --- INSTANCE OF PRESS-TO-START ---
         self.button_press_to_start = GPUImage(
             renderer,
-            image_path="assets/images/button_press-to-start.png", 
+            image_path=self.PRESS_TO_START_PATH,
             position=(0,0)
         )
         # Scale to screen size
@@ -80,7 +142,7 @@ class MainScreen(ScreenInterface):
         # --- INSTANCE OF START BUTTON ---
         self.button_take_photo = GPUImage(
             renderer,
-            image_path="assets/images/button_take-photo.png", 
+            image_path=self.TAKE_PHOTO_PATH,
             position=(0,0)
         )
         # Scale to screen size. Base image is approx 420x420? Let's check or assume relative scale.
@@ -110,18 +172,46 @@ class MainScreen(ScreenInterface):
         
         # --- INSTANCE OF SETTINGS BUTTON ---
         from ui.gpu_button import GPUImageButton
+        # Scale to screen size (Ratio based on 1280x800)
+        # 40x40 is base size for icon
+        new_size = int(40 * self.sizing_factor)
         self.settings_btn = GPUImageButton(
             renderer,
-            image_path="assets/images/icon-settings.png",
+            image_path=self.SETTINGS_ICON_PATH,
             position=(self.width - 60, 20),
-            size=(40, 40)
+            size=(new_size, new_size)
         )
-        # Scale to screen size (Ratio based on 1280x800)
-        # 40x40 is base size for icon
-        new_size = int(40 * self.sizing_factor)
-        self.settings_btn.resize(new_size, new_size) 
         self.settings_btn.bg_color = None # Transparent
 
+        # --- STATIC LAYERS ---
+        # The background is opaque, so it is drawn without blending.
+        self.background_layer = StaticLayer(
+            renderer, [self.background_image], (0, 0, self.width, self.height), opaque=True
+        )
+        # The two center buttons are flattened into one texture sized to their union.
+        # The settings icon sits in a corner; a layer spanning to it would blend
+        # far more (transparent) pixels than drawing it directly.
+        self.buttons_layer = StaticLayer(
+            renderer,
+            [self.button_press_to_start, self.button_take_photo],
+            StaticLayer.union_bounds([self.button_press_to_start.image_rect, self.button_take_photo.image_rect])
+        )
+
+    @staticmethod
+    def asset_manifest(width, height):
+        sizing_factor = width / 1280
+        icon_size = int(40 * sizing_factor)
+        specs = [
+            (MainScreen.BACKGROUND_PATH, (width, height), 'smoothscale'),
+            # Buttons are scaled relative to their original size, decode the originals
+            (MainScreen.PRESS_TO_START_PATH, None, None),
+            (MainScreen.TAKE_PHOTO_PATH, None, None),
+            (MainScreen.SETTINGS_ICON_PATH, (icon_size, icon_size), 'smoothscale'),
+        ]
+        for path in MainScreen.PARTY_PIC_PATHS:
+            specs.extend(GPUPolaroid.asset_specs(path, size=300 * sizing_factor))
+        return specs
+
     def handle_event(self, event, switch_screen_callback):
         # Handle Settings Click
         if self.settings_btn.is_clicked(event):
@@ -133,68 +223,260 @@ class MainScreen(ScreenInterface):
             logger.info("Screen touched! Starting procedure...")
             switch_screen_callback('countdown')
 
+    def _build_orbit_arrays(self):
+        """(Re)builds the per-polaroid orbit state arrays from the visible polaroids."""
+        indices = self.visible_indices
+        self.orbit_angle_offsets = np.array([self.polaroid_angle_offsets[i] for i in indices], dtype=np.float64)
+        self.orbit_rotation_offsets = np.array([self.polaroid_rotation_offsets[i] for i in indices], dtype=np.float64)
+        self.orbit_half_w = np.array([p.frame.image_rect.width / 2 for p in self.visible_polaroids], dtype=np.float64)
+        self.orbit_half_h = np.array([p.frame.image_rect.height / 2 for p in self.visible_polaroids], dtype=np.float64)
+
+    def update_orbit_lever(self):
+        """
+        Lets the quality governor use 'orbit_polaroids' only while polaroids are
+        drawn individually: the ring is one blit however many it holds, and
+        changing them would re-bake the whole ring on an overloaded frame.
+        """
+        get_quality_governor().set_lever_active('orbit_polaroids', self.orbit_mode == 'individual')
+
+    def set_visible_polaroids(self, count):
+        """Shows 'count' polaroids, spread evenly over the orbit."""
+        count = max(1, min(len(self.polaroids), int(count)))
+        if count == len(self.visible_indices):
+            return
+
+        step = len(self.polaroids) / count
+        self.visible_indices = sorted({int(i * step) for i in range(count)})
+        self.visible_polaroids = [self.polaroids[i] for i in self.visible_indices]
+        self._build_orbit_arrays()
+        self.invalidate_ring()
+        logger.info(f"Showing {len(self.visible_indices)} of {len(self.polaroids)} orbit polaroids.")
+
+    def compute_orbit_layout(self, orbit_angle=None, center=None):
+        """
+        Computes top-left positions and rotations of all polaroids in one pass.
+        Defaults to the current orbit angle and the on-screen orbit center.
+        Returns (xs, ys, rotations) as numpy arrays.
+        """
+        if orbit_angle is None:
+            orbit_angle = self.orbit_angle
+        center_x, center_y = center if center is not None else (self.center_x, self.center_y)
+
+        rad = np.radians((orbit_angle + self.orbit_angle_offsets) % 360)
+
+        centers_x = center_x + self.orbit_radius * np.cos(rad)
+        centers_y = center_y + self.orbit_radius * np.sin(rad)
+
+        # Rotation: bottom of the polaroid points to the orbit center.
+        # Math angles are CCW, SDL_RenderCopyEx angles are CW, so the GL rotation
+        # (-target_angle - 270 + offset) is negated for SDL.
+        target_angle_deg = np.degrees(np.arctan2(center_y - centers_y, center_x - centers_x))
+        sdl_rotations = target_angle_deg + 270.0 - self.orbit_rotation_offsets
+
+        # Top-Left Position of Frame
+        return centers_x - self.orbit_half_w, centers_y - self.orbit_half_h, sdl_rotations
+
     def update_polaroid_position(self, dt):
-        """Calculates polaroid positions on orbit."""
+        """Calculates polaroid positions on orbit (vectorized) and pushes them to the polaroids."""
         
         self.orbit_angle += self.orbit_speed * dt
         self.orbit_angle %= 360 
-        
-        for polaroid in self.polaroids:
-            current_polaroid_angle = (self.orbit_angle + polaroid.angle_offset) % 360
-            
-            rad = math.radians(current_polaroid_angle) 
-            
-            new_center_x = self.center_x + self.orbit_radius * math.cos(rad)
-            new_center_y = self.center_y + self.orbit_radius * math.sin(rad)
-            
-            # Top-Left Position of Frame
-            frame_w = polaroid.frame.image_rect.width
-            frame_h = polaroid.frame.image_rect.height
-            
-            polaroid_top_left_x = new_center_x - (frame_w / 2)
-            polaroid_top_left_y = new_center_y - (frame_h / 2)
-            
-            polaroid.set_position((polaroid_top_left_x, polaroid_top_left_y))
-            
-            # Calculate Rotation (Bottom pointing to Center)
-            vector_x = self.center_x - new_center_x
-            vector_y = self.center_y - new_center_y
-            
-            angle_rad = math.atan2(vector_y, vector_x)
-            target_angle_deg = math.degrees(angle_rad)
-            
-            # +90 offset (or -270) to align bottom to center
-            # Note: Pygame rotation is counter-clockwise. GL was also CCW?
-            # We might need to invert sign if logic differs.
-            # GL: glRotatef(angle, 0, 0, 1) -> CCW
-            # SDL2: angle -> CW? Usually SDL2 angle is Degrees Clockwise.
-            # Pygame `transform.rotate` is CCW.
-            # Pygame `Texture.draw(angle=...)`?
-            # SDL_RenderCopyEx takes angle in degrees clockwise.
-            # So I probably need to invert the angle sign compared to GL/Math.
-            
-            # Math: CCW positive.
-            # SDL: CW positive.
-            # So: new_rotation = - (math_angle) 
-            
-            # Original GL: 
-            # new_rotation = -target_angle_deg - 270.0
-            # new_rotation += offset
-            
-            # If SDL is CW (opposite of math/GL), we negate.
-            # new_rotation_sdl = - (-target_angle_deg - 270.0) = target_angle_deg + 270.0
-            
-            # We want bottom of polaroid pointing to center.
-            # Let's try mirroring the logic first, and if it spins wrong way, negate.
-            # But usually `math.degrees` -> CCW.
-            
-            new_rotation = target_angle_deg + 90 # Point top to center? No bottom.
-            # Let's stick to the GL logic negated for now.
-            
-            gl_rotation = -target_angle_deg - 270.0 + polaroid.rotation_offset
-            sdl_rotation = -gl_rotation 
-            
-            polaroid.set_rotation(sdl_rotation)
+
+        # The ring moves rigidly, only the angle of the baked ring changes
+        if self.orbit_mode == 'ring':
+            return
+
+        xs, ys, rotations = self.compute_orbit_layout()
+        for polaroid, x, y, rotation in zip(self.visible_polaroids, xs.tolist(), ys.tolist(), rotations.tolist()):
+            polaroid.set_transform((x, y), rotation)
+
+    def hidden_polaroids(self):
+        """Orbit angles of the visible polaroids and whether each is entirely off screen."""
+        angles = (self.orbit_angle + self.orbit_angle_offsets) % 360
+        rad = np.radians(angles)
+        xs = self.center_x + self.orbit_radius * np.cos(rad)
+        ys = self.center_y + self.orbit_radius * np.sin(rad)
+        half_diagonals = np.hypot(self.orbit_half_w, self.orbit_half_h)
+        hidden = (
+            (ys - half_diagonals > self.height)
+            | (xs + half_diagonals < 0)
+            | (xs - half_diagonals > self.width)
+        )
+        return angles, hidden
+
+    def next_hidden_slot(self):
+        """
+        Index (into self.polaroids) of the off-screen polaroid that comes into
+        view next and wasn't swapped yet while hidden, or None.
+        """
+        angles, hidden = self.hidden_polaroids()
+
+        best = None
+        best_distance = 360.0
+        # The orbit turns towards larger angles and peaks at 270 degrees (top of the screen)
+        for slot, is_hidden, distance in zip(self.visible_indices, hidden.tolist(), ((270.0 - angles) % 360).tolist()):
+            if not is_hidden:
+                self.slot_swapped[slot] = False
+            elif not self.slot_swapped[slot] and distance < best_distance:
+                best, best_distance = slot, distance
+        return best
+
+    def slot_hidden(self, slot):
+        """Whether the polaroid in 'slot' is off screen (or not on the orbit at all)."""
+        if slot not in self.visible_indices:
+            return True
+        _, hidden = self.hidden_polaroids()
+        return bool(hidden[self.visible_indices.index(slot)])
+
+    def update_gallery(self, dt):
+        """
+        Swaps decoded gallery photos into the next hidden orbit slot (render
+        thread). A swap is split over frames: the texture upload, the
+        polaroid bake, then (ring mode) the patch of the baked ring. A step
+        waits for a frame whose predecessor left room for its measured cost
+        (FrameScheduler.headroom()), at most SWAP_MAX_DEFER seconds, and
+        never past the moment its slot comes into view.
+        """
+        self.swap_timer += dt
+        if self.gallery is None:
+            return
+        if self.swap_steps:
+            self.run_swap_step(dt)
+            return
+        if self.swap_timer < self.SWAP_INTERVAL or not self.gallery.has_ready:
+            return
+
+        slot = self.next_hidden_slot()
+        if slot is None:
+            return
+        path = self.gallery.take_ready()
+        if path is None:
+            return
+        self.swap_timer = 0.0
+        self.slot_swapped[slot] = True
+        if path == self.slot_paths[slot]:
+            return
+
+        self.swap_slot = slot
+        self.swap_path = path
+        self.swap_steps = ['bake', 'ring'] if self.orbit_mode == 'ring' else ['bake']
+        self.swap_waited = 0.0
+
+    def run_swap_step(self, dt):
+        """Runs the next step of the swap in progress if this frame has room for it."""
+        step = self.swap_steps[0]
+        self.swap_waited += dt
+        if (
+            get_frame_scheduler().headroom() < self.swap_costs[step]
+            and self.swap_waited < self.SWAP_MAX_DEFER
+            and self.slot_hidden(self.swap_slot)
+        ):
+            return
+
+        start = time.perf_counter()
+        if step == 'bake':
+            self.polaroids[self.swap_slot].set_photo(self.swap_path)
+            self.slot_paths[self.swap_slot] = self.swap_path
+        elif self.orbit_mode == 'ring':
+            self.bake_ring_slot(self.swap_slot)
+        cost = time.perf_counter() - start
+        self.swap_costs[step] += self.SWAP_SMOOTHING * (cost - self.swap_costs[step])
+
+        self.swap_steps.pop(0)
+        self.swap_waited = 0.0
+
+    def invalidate_ring(self):
+        """Marks the baked ring as stale (e.g. after a polaroid's photo changed)."""
+        self.ring_dirty = True
+
+    def bake_ring(self):
+        """Renders all polaroids at orbit angle 0 into one texture centered on the orbit center."""
+        # Furthest polaroid corner from the orbit center
+        half_diagonals = np.hypot(self.orbit_half_w, self.orbit_half_h)
+        extent = int(np.ceil(self.orbit_radius + (half_diagonals.max() if len(half_diagonals) else 0)))
+        ring_scale = min(1.0, self.MAX_RING_TEXTURE_SIZE / (2 * extent))
+        texture_size = (int(2 * extent * ring_scale), int(2 * extent * ring_scale))
+
+        try:
+            if self.ring_texture is None or self.ring_texture.get_rect().size != texture_size:
+                self.ring_texture = None
+                self.ring_texture = create_render_target(self.renderer, texture_size)
+                get_texture_cache(self.renderer).track(('orbit_ring', id(self)), texture_size)
+        except Exception as e:
+            logger.warn(f"Could not create {texture_size[0]}x{texture_size[1]} ring texture ({e}), drawing polaroids individually.")
+            self.orbit_mode = 'individual'
+            self.update_orbit_lever()
+            self.ring_texture = None
+            self.update_polaroid_position(0)
+            return
+
+        xs, ys, rotations = self.compute_orbit_layout(orbit_angle=0.0, center=(extent, extent))
+        with render_to(self.renderer, self.ring_texture):
+            self.renderer.scale = (ring_scale, ring_scale)
+            for polaroid, x, y, rotation in zip(self.visible_polaroids, xs.tolist(), ys.tolist(), rotations.tolist()):
+                polaroid.set_transform((x, y), rotation)
+                polaroid.draw()
+
+        self.ring_extent = extent
+        self.ring_dirty = False
+        logger.info(f"Baked orbit ring ({texture_size[0]}x{texture_size[1]}, scale {ring_scale:.2f}).")
+
+    def bake_ring_slot(self, slot):
+        """
+        Redraws the area of one polaroid in the baked ring (after its photo
+        changed), including the parts of neighbours overlapping it. The
+        viewport clips the redraw, so only that area's pixels are touched.
+        """
+        if self.ring_dirty or self.ring_texture is None:
+            return # A full bake is pending anyway
+        if slot not in self.visible_indices:
+            return
+
+        extent = self.ring_extent
+        ring_scale = self.ring_texture.width / (2 * extent)
+        xs, ys, rotations = self.compute_orbit_layout(orbit_angle=0.0, center=(extent, extent))
+        radii = np.hypot(self.orbit_half_w, self.orbit_half_h)
+        centers_x = xs + self.orbit_half_w
+        centers_y = ys + self.orbit_half_h
+
+        k = self.visible_indices.index(slot)
+        radius = radii[k] + 1
+        area = pygame.Rect(
+            int(centers_x[k] - radius), int(centers_y[k] - radius),
+            int(2 * radius) + 2, int(2 * radius) + 2
+        )
+        # Bounding circles that reach into the area, redrawn in bake order to keep the stacking
+        overlapping = np.hypot(centers_x - centers_x[k], centers_y - centers_y[k]) < radii + radius * np.sqrt(2)
+
+        with render_to(self.renderer, self.ring_texture, clear_color=None):
+            self.renderer.scale = (ring_scale, ring_scale)
+            self.renderer.set_viewport(area)
+            blend_mode = self.renderer.draw_blend_mode
+            self.renderer.draw_blend_mode = 0 # Overwrite with transparent pixels
+            self.renderer.draw_color = (0, 0, 0, 0)
+            self.renderer.fill_rect(pygame.Rect(0, 0, area.width, area.height))
+            self.renderer.draw_blend_mode = blend_mode
+
+            for polaroid, x, y, rotation, hit in zip(
+                self.visible_polaroids, xs.tolist(), ys.tolist(), rotations.tolist(), overlapping.tolist()
+            ):
+                if hit:
+                    polaroid.set_transform((x - area.x, y - area.y), rotation)
+                    polaroid.draw()
+
+    def draw_ring(self):
+        """Draws the baked ring rotated about the orbit center."""
+        if self.ring_dirty:
+            self.bake_ring()
+            if self.orbit_mode != 'ring':
+                return
+
+        size = 2 * self.ring_extent
+        self.ring_texture.draw(
+            dstrect=(self.center_x - self.ring_extent, self.center_y - self.ring_extent, size, size),
+            angle=self.orbit_angle,
+            origin=(self.ring_extent, self.ring_extent)
+        )
 
     def update(self, dt, callback):
         if dt > 0:
@@ -202,7 +484,10 @@ class MainScreen(ScreenInterface):
             text = f"FPS: {fps:.2f}"
             self.fps_label.update_text(text)
 
+        if self.orbit_mode == 'individual':
+            self.set_visible_polaroids(get_quality_governor().get("orbit_polaroids"))
         self.update_polaroid_position(dt)
+        self.update_gallery(dt)
 
     def draw(self, renderer):
         # 1. Clear Screen
@@ -210,14 +495,18 @@ class MainScreen(ScreenInterface):
         renderer.clear()
         
         # 2. Draw Elements
-        self.background_image.draw()
+        self.background_layer.draw()
 
-        for polaroid in self.polaroids:
-            polaroid.draw()
+        if self.orbit_mode == 'ring':
+            self.draw_ring()
+
+        # Also the fallback if the ring texture couldn't be created
+        if self.orbit_mode == 'individual':
+            for polaroid in self.visible_polaroids:
+                polaroid.draw()
 
         self.fps_label.draw()
-        self.button_press_to_start.draw()
-        self.button_take_photo.draw()
+        self.buttons_layer.draw()
         self.settings_btn.draw()
         
         # 3. Present (Handled by main loop typically, but if manager calls draw, it might expect us to just draw)
@@ -227,6 +516,9 @@ class MainScreen(ScreenInterface):
 
     def on_enter(self, **context_data):
         logger.info("Entering MainScreen.")
+        if self.gallery:
+            # A session may just have finished
+            self.gallery.refresh()
 
     def on_exit(self):
         logger.info("Exiting MainScreen.")
@@ -235,4 +527,19 @@ class MainScreen(ScreenInterface):
         # (Usually we keep textures if we return, but for memory we can clean)
         pass
 
+    def cleanup(self):
+        if self.gallery:
+            self.gallery.stop()
+        self.background_layer.cleanup()
+        self.buttons_layer.cleanup()
+        self.background_image.cleanup()
+        for polaroid in self.polaroids:
+            polaroid.cleanup()
+        self.ring_texture = None
+        get_texture_cache(self.renderer).untrack(('orbit_ring', id(self)))
+        self.fps_label.cleanup()
+        self.button_press_to_start.cleanup()
+        self.button_take_photo.cleanup()
+        self.settings_btn.cleanup()
+
         
\ No newline at end of file
@@ -1,11 +1,17 @@
 import os
-import datetime
+import time
 import pygame
 from screens.screen_interface import ScreenInterface
 from utils.logger import get_logger
 from ui.gpu_image import GPUImage
 from ui.live_preview import LivePreview
 from ui.gpu_polaroid import GPUPolaroid
+from utils.color_filters import get_color_filter
+from utils.photo_store import get_photo_store
+from utils.photo_writer import get_photo_writer
+from utils.rendition_pipeline import get_rendition_pipeline
+from utils.print_spooler import get_print_spooler
+from utils.strip_compositor import get_strip_compositor
 
 logger = get_logger("PhotoScreen")
 
@@ -14,6 +20,10 @@ class PhotoScreen(ScreenInterface):
     Shows a white flash, captures a high-res photo, and displays it as a polaroid 
     with a live preview in the background.
     """
+
+    FLASH_PATH = "assets/images/white_flash.png"
+    shows_live_preview = True
+
     def __init__(self, renderer, width, height, camera):
         self.renderer = renderer
         self.width = width
@@ -24,14 +34,14 @@ class PhotoScreen(ScreenInterface):
         self.sizing_factor = width / 1280
         
         # White Flash Overlay
-        self.flash_overlay = GPUImage(renderer, "assets/images/white_flash.png")
-        self.flash_overlay.resize(width, height)
+        self.flash_overlay = GPUImage(renderer, self.FLASH_PATH, size=(width, height))
         self.flash_overlay.set_position((0, 0))
         self.flash_overlay.alpha = 255
         
         self.polaroid = None
         self.polaroids_list = [] # List of previously captured polaroids
         self.photo_index = 1
+        self.session_id = None # See PhotoStore
         
         self.elapsed_time = 0.0
         self.is_captured = False
@@ -44,12 +54,32 @@ class PhotoScreen(ScreenInterface):
         self.polaroid_target_rot = 0
         self.polaroid_target_scale = 1.0
 
+    @staticmethod
+    def asset_manifest(width, height):
+        return [(PhotoScreen.FLASH_PATH, (width, height), 'smoothscale')]
+
     def handle_event(self, event, switch_screen_callback):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE:
-                switch_screen_callback('main')
+                self.end_session(switch_screen_callback)
         elif event.type == pygame.FINGERDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-            switch_screen_callback('main')
+            self.end_session(switch_screen_callback)
+
+    def end_session(self, switch_screen_callback):
+        """Releases the session's polaroids and returns to the main screen."""
+        for p in self.polaroids_list:
+            p.cleanup()
+        self.polaroids_list = []
+        complete = self.photo_index >= 3
+        get_photo_store().end_session(self.session_id, 'complete' if complete else 'aborted')
+        if complete:
+            # Print page from the full-resolution captures, rendered in worker processes, then queued for printing
+            get_strip_compositor().compose_session(
+                self.session_id,
+                on_done=lambda session_id, path: get_print_spooler().submit(path, session_id=session_id)
+            )
+        self.session_id = None
+        switch_screen_callback('main')
 
     def update(self, dt, callback):
         self.elapsed_time += dt
@@ -66,26 +96,31 @@ class PhotoScreen(ScreenInterface):
             
             # (Wait is already handled inside stop_continuous)
             
+            capture_start = time.perf_counter()
             high_res_img = self.camera_handler.take_photo()
+            capture_ms = (time.perf_counter() - capture_start) * 1000
             if high_res_img:
-                if not os.path.exists("photos"):
-                    os.makedirs("photos")
-                
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"photos/photo_{timestamp}.jpg"
-                high_res_img.save(filename, "JPEG", quality=95)
-                logger.info(f"Photo saved to {filename}")
-
-                filename = f"photos/photo_{timestamp}_p.jpg"
-                self.preview_image.save(filename, "JPEG", quality=95)
-                
-                # Create Polaroid (Size 500 scaled)
-                self.polaroid = GPUPolaroid(self.renderer, filename, size=int(500 * self.sizing_factor))
-                
-                # Center Polaroid
-                p_w = self.polaroid.frame.image_rect.width
-                p_h = self.polaroid.frame.image_rect.height
-                self.polaroid.set_position(((self.width - p_w) // 2, (self.height - p_h) // 2))
+                # Encoding, writing and the color filter look happen on the photo writer threads
+                store = get_photo_store()
+                writer = get_photo_writer()
+                color_lut = get_color_filter().lut
+                photo_id, photo_path = store.new_photo(self.session_id, capture_ms)
+                writer.submit(
+                    high_res_img, photo_path, color_lut=color_lut,
+                    on_done=lambda job: self._photo_saved(photo_id, job)
+                )
+                # Thumbnail/polaroid/screen sizes for later consumers, from the image still in memory
+                get_rendition_pipeline().submit(
+                    photo_path, image=high_res_img, color_lut=color_lut,
+                    on_done=lambda _path, renditions: store.add_renditions(photo_id, renditions)
+                )
+                if self.preview_image is not None:
+                    filename = os.path.splitext(photo_path)[0] + "_p.jpg"
+                    # Live view sized, the look is cheap enough to apply here
+                    preview_image = color_lut.apply(self.preview_image) if color_lut else self.preview_image
+                    writer.submit(preview_image, filename)
+                    # Built from the frame in memory, not from the file being written
+                    self._create_polaroid(preview_image, filename)
             else:
                 logger.error("Failed to capture photo!")
             
@@ -192,7 +227,10 @@ class PhotoScreen(ScreenInterface):
             
             if self.photo_index < 3:
                 # Go to next photo
-                callback('countdown', photo_index=self.photo_index + 1, polaroids=self.polaroids_list)
+                callback(
+                    'countdown', photo_index=self.photo_index + 1,
+                    polaroids=self.polaroids_list, session_id=self.session_id
+                )
             else:
                 # Finished session
                 # Wait a bit? Or show 'done' screen. 
@@ -202,6 +240,19 @@ class PhotoScreen(ScreenInterface):
                 # Stay on screen indefinitely. User clicks to exit (handled in handle_event).
                 pass
 
+    @staticmethod
+    def _photo_saved(photo_id, job):
+        """PhotoWriter callback (writer thread): records the saved photo in the index."""
+        if job.ok:
+            get_photo_store().photo_saved(photo_id, job.size, job.write_ms)
+
+    def _create_polaroid(self, image, name):
+        """Creates the centered polaroid (size 500 scaled) from the captured frame."""
+        self.polaroid = GPUPolaroid(self.renderer, image, size=int(500 * self.sizing_factor), name=name)
+        p_w = self.polaroid.frame.image_rect.width
+        p_h = self.polaroid.frame.image_rect.height
+        self.polaroid.set_position(((self.width - p_w) // 2, (self.height - p_h) // 2))
+
     def draw(self, renderer):
         # Background: Live Preview
         if self.preview.texture:
@@ -229,6 +280,7 @@ class PhotoScreen(ScreenInterface):
         # Retrieve Context
         self.photo_index = context_data.get('photo_index', 1)
         self.polaroids_list = context_data.get('polaroids', [])
+        self.session_id = context_data.get('session_id') or get_photo_store().begin_session()
         
         self.animation_phase = 'flash'
         
@@ -243,3 +295,13 @@ class PhotoScreen(ScreenInterface):
         # If we switch to 'countdown', we pass ownership.
         # So we clear our own reference?
         self.polaroids_list = []
+
+    def cleanup(self):
+        self.flash_overlay.cleanup()
+        if self.polaroid:
+            self.polaroid.cleanup()
+            self.polaroid = None
+        for p in self.polaroids_list:
+            p.cleanup()
+        self.polaroids_list = []
+        self.preview.release()
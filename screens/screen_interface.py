@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
 
 class ScreenInterface(ABC):
-    
+
+    # Whether the screen shows the camera's live view: only then do new camera
+    # frames (CAMERA_FRAME_EVENT) wake the idle main loop
+    shows_live_preview = False
+
     @abstractmethod
     def handle_event(self, event, callback):
         """
@@ -39,4 +43,27 @@ class ScreenInterface(ABC):
         Called when the screen is exited/deactivated. 
         Used for cleanup, saving state, or stopping music.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def asset_manifest(width, height):
+        """
+        Returns the (path, size, transform) texture specs the screen loads at this
+        resolution, so they can be decoded in parallel before it is constructed.
+        """
+        return []
+
+    def needs_redraw(self):
+        """
+        Returns True if the screen would draw something different from the last
+        frame. Screens that only change on input can return False while idle, so
+        the main loop skips drawing and presenting.
+        """
+        return True
+
+    def cleanup(self):
+        """
+        Called when the screen is discarded (e.g. after settings are applied).
+        Releases the shared textures held by the screen.
+        """
+        pass
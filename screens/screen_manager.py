@@ -1,54 +1,140 @@
+from contextlib import nullcontext
 from .screen_interface import ScreenInterface
 from utils.logger import get_logger
 
 logger = get_logger("ScreenManager")
 
 class ScreenManager:
-    """Manages the application's current screen state."""
-    def __init__(self):
+    """
+    Manages the application's current screen state.
+
+    Screens are either registered as instances (add_screen) or as factories
+    (add_screen_factory) that are only called when the screen is first used.
+    Factories declare what they depend on (e.g. 'resolution', 'camera'), so
+    invalidate() can rebuild just the screens affected by a settings change.
+
+    If a FrameScheduler is given, update() and draw() are timed as frame phases
+    of the current screen.
+    """
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler
         self.screens = {}
+        self.factories = {} # name -> (factory, frozenset of dependencies)
         self.current_screen = None
+        self.current_name = None
+        self._stale_current = False # Current screen was invalidated while shown
+        self._switched = False # Screen changed since the last draw
 
     def add_screen(self, name: str, screen_instance: ScreenInterface):
         """Registers a screen instance with a name."""
         self.screens[name] = screen_instance
 
+    def add_screen_factory(self, name: str, factory, depends_on=()):
+        """Registers a callable that constructs the screen on first use."""
+        self.factories[name] = (factory, frozenset(depends_on))
+
+    def has_screen(self, name: str):
+        return name in self.screens or name in self.factories
+
+    def get_screen(self, name: str):
+        """Returns the screen, constructing it from its factory if needed."""
+        screen = self.screens.get(name)
+        if screen is None and name in self.factories:
+            logger.info(f"Constructing screen '{name}'...")
+            factory, _ = self.factories[name]
+            screen = factory()
+            self.screens[name] = screen
+        return screen
+
     def set_initial_screen(self, name: str):
         """Sets the starting screen."""
-        if name in self.screens:
-            self.current_screen = self.screens[name]
+        if self.has_screen(name):
+            self.current_screen = self.get_screen(name)
+            self.current_name = name
+            self._switched = True
             self.current_screen.on_enter()
         else:
             raise ValueError(f"Screen '{name}' not found.")
 
     def switch_to(self, screen_name: str, **context_data):
         """Switches the current screen by name, calling on_exit and on_enter."""
-        if screen_name not in self.screens:
+        if not self.has_screen(screen_name):
             logger.error(f"Error: Screen '{screen_name}' not found.")
             return
 
         if self.current_screen:
             self.current_screen.on_exit()
-        
-        self.current_screen = self.screens[screen_name]
+            if self._stale_current:
+                # Invalidated while it was shown, release it now
+                self.current_screen.cleanup()
+                self._stale_current = False
+
+        self.current_screen = self.get_screen(screen_name)
+        self.current_name = screen_name
+        self._switched = True
         self.current_screen.on_enter(**context_data)
 
+    def invalidate(self, changes):
+        """
+        Drops the constructed screens whose dependencies intersect 'changes'.
+        They are rebuilt from their factories on next use. The current screen
+        keeps running until the next switch_to().
+        """
+        changes = set(changes)
+        for name, (_, depends_on) in self.factories.items():
+            screen = self.screens.get(name)
+            if screen is None or not (depends_on & changes):
+                continue
+
+            logger.info(f"Screen '{name}' affected by {sorted(depends_on & changes)}, will rebuild.")
+            del self.screens[name]
+            if screen is self.current_screen:
+                self._stale_current = True
+            else:
+                screen.cleanup()
+
     def handle_event(self, event):
         """Passes events to the current screen."""
         if self.current_screen:
             self.current_screen.handle_event(event, self.switch_to)
 
+    def _phase(self, name):
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.phase(name, self.current_name)
+
     def update(self, dt):
         """Updates the logic of the current screen."""
         if self.current_screen:
-            self.current_screen.update(dt, self.switch_to)
+            with self._phase("update"):
+                self.current_screen.update(dt, self.switch_to)
+
+    def shows_live_preview(self):
+        """True if the current screen displays the camera's live view."""
+        return self.current_screen is not None and self.current_screen.shows_live_preview
+
+    def needs_redraw(self):
+        """True if the current screen changed or reports changes since the last draw."""
+        if self._switched:
+            return True
+        return self.current_screen is not None and self.current_screen.needs_redraw()
 
     def draw(self, target_surface):
         """Draws the current screen onto the main surface."""
+        self._switched = False
         if self.current_screen:
-            self.current_screen.draw(target_surface)
+            with self._phase("draw"):
+                self.current_screen.draw(target_surface)
+
+    def cleanup(self):
+        """Releases the resources of all constructed screens."""
+        for screen in self.screens.values():
+            screen.cleanup()
+        if self._stale_current and self.current_screen:
+            self.current_screen.cleanup()
+            self._stale_current = False
 
     def exit(self):
         """Cleans up the current screen."""
         if self.current_screen:
-            self.current_screen.on_exit()
\ No newline at end of file
+            self.current_screen.on_exit()
@@ -3,7 +3,9 @@ import pygame
 from ui.gpu_image import GPUImage
 from ui.gpu_button import GPUImageButton
 from ui.gpu_selector import GPUSelector
+from ui.static_layer import StaticLayer
 from .screen_interface import ScreenInterface
+from utils.color_filters import LOOKS
 from utils.logger import get_logger
 from config import *
 
@@ -11,7 +13,9 @@ logger = get_logger("SettingsScreen")
 
 class SettingsScreen(ScreenInterface):
     """Screen for configuring application settings."""
-    
+
+    BACKGROUND_PATH = "assets/images/background.png"
+
     def __init__(self, renderer, width, height, settings_manager, apply_callback):
         self.renderer = renderer
         self.width = width
@@ -26,8 +30,7 @@ class SettingsScreen(ScreenInterface):
         self.font = pygame.font.SysFont("Arial", 24)
         
         # UI Elements
-        self.background = GPUImage(renderer, "assets/images/background.png")
-        self.background.resize(width, height)
+        self.background = GPUImage(renderer, self.BACKGROUND_PATH, size=(width, height))
         
         self.title = GPUImageButton(renderer, text="Settings", position=(50, 50), font=pygame.font.SysFont("Arial", 40), color=(0,0,0))
         self.title.bg_color = None
@@ -60,45 +63,96 @@ class SettingsScreen(ScreenInterface):
             font=self.font
         )
         
+        # Color Filter Selector ("none" is stored as "")
+        self.filter_label = GPUImageButton(renderer, text="Color Filter:", position=(100, 290), font=self.font, color=(0,0,0))
+        self.filter_label.bg_color = None
+        
+        current_filter = self.settings.get("color_filter", "") or "none"
+        self.filter_selector = GPUSelector(
+            renderer,
+            options=["none"] + list(LOOKS),
+            selected_value=current_filter,
+            position=(300, 280),
+            width=200,
+            font=self.font
+        )
+        
         # Apply Button
         self.apply_btn = GPUImageButton(
-            renderer, text="Save & Apply", position=(100, 300), font=self.font, color=(255,255,255), border_radius=btn_radius
+            renderer, text="Save & Apply", position=(100, 370), font=self.font, color=(255,255,255), border_radius=btn_radius
         )
         self.apply_btn.bg_color = (50, 150, 50, 255)
         self.apply_btn.resize(200, 60)
-        self.apply_btn.set_position((100, 300))
+        self.apply_btn.set_position((100, 370))
         
         # Cancel/Back Button
         self.back_btn = GPUImageButton(
-            renderer, text="Cancel", position=(380, 300), font=self.font, color=(255,255,255), border_radius=btn_radius
+            renderer, text="Cancel", position=(380, 370), font=self.font, color=(255,255,255), border_radius=btn_radius
         )
         self.back_btn.bg_color = (150, 50, 50, 255)
         self.back_btn.resize(150, 60)
-        self.back_btn.set_position((380, 300))
+        self.back_btn.set_position((380, 370))
 
         # Restart Button
         self.restart_btn = GPUImageButton(
-            renderer, text="Restart App", position=(100, 380), font=self.font, color=(255,255,255), border_radius=btn_radius
+            renderer, text="Restart App", position=(100, 450), font=self.font, color=(255,255,255), border_radius=btn_radius
         )
         self.restart_btn.bg_color = (200, 50, 50, 255)
         self.restart_btn.resize(150, 60)
-        self.restart_btn.set_position((100, 380))
+        self.restart_btn.set_position((100, 450))
+
+        # Everything except the expanded dropdowns is static: flatten it into one
+        # opaque layer and re-render it only when a widget changes.
+        self.static_layer = StaticLayer(
+            renderer,
+            [
+                self.background, self.title,
+                self.cam_label, self.camera_selector,
+                self.res_label, self.res_selector,
+                self.filter_label, self.filter_selector,
+                self.apply_btn, self.back_btn, self.restart_btn,
+            ],
+            (0, 0, width, height),
+            opaque=True
+        )
+
+        # Nothing animates here, only input changes the picture
+        self._dirty = True
+
+    @staticmethod
+    def asset_manifest(width, height):
+        return [(SettingsScreen.BACKGROUND_PATH, (width, height), 'smoothscale')]
 
     def handle_event(self, event, switch_screen_callback):
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.FINGERDOWN,
+                          pygame.FINGERUP, pygame.KEYDOWN):
+            self._dirty = True
+
         # Handle Selectors (Top one first if expanded logic was complex, but click detection handles it)
         # Check expansion to determine priority!
         
         # If camera selector expanded, it takes priority
         if self.camera_selector.expanded:
-            if self.camera_selector.handle_event(event): return
+            if self.camera_selector.handle_event(event):
+                self.static_layer.invalidate()
+                return
             # Consume click if outside? Nah for now simple.
             
         if self.res_selector.expanded:
-            if self.res_selector.handle_event(event): return
+            if self.res_selector.handle_event(event):
+                self.static_layer.invalidate()
+                return
+
+        if self.filter_selector.expanded:
+            if self.filter_selector.handle_event(event):
+                self.static_layer.invalidate()
+                return
             
         # Normal detection
-        if self.camera_selector.handle_event(event): return
-        if self.res_selector.handle_event(event): return
+        if (self.camera_selector.handle_event(event) or self.res_selector.handle_event(event)
+                or self.filter_selector.handle_event(event)):
+            self.static_layer.invalidate()
+            return
 
         # Handle Buttons
         if self.back_btn.is_clicked(event):
@@ -114,12 +168,14 @@ class SettingsScreen(ScreenInterface):
         if self.apply_btn.is_clicked(event):
             new_cam = self.camera_selector.get_value()
             new_res = self.res_selector.get_value()
+            new_filter = self.filter_selector.get_value()
             
             self.settings.set("camera_type", new_cam)
             self.settings.set("screen_size", new_res)
+            self.settings.set("color_filter", "" if new_filter == "none" else new_filter)
             self.settings.save()
             
-            logger.info(f"Saving settings: Camera={new_cam}, Resolution={new_res}")
+            logger.info(f"Saving settings: Camera={new_cam}, Resolution={new_res}, Filter={new_filter}")
             
             # Trigger Apply Callback (re-init camera & screen)
             if self.apply_callback:
@@ -130,32 +186,37 @@ class SettingsScreen(ScreenInterface):
     def update(self, dt, callback):
         pass
 
+    def needs_redraw(self):
+        return self._dirty or self.static_layer.dirty
+
     def draw(self, renderer):
         renderer.draw_color = (240, 240, 240, 255)
         renderer.clear()
         
-        self.background.draw()
-        self.title.draw()
-        
-        self.cam_label.draw()
-        self.camera_selector.draw()
-        
-        self.res_label.draw()
-        self.res_selector.draw()
-        
-        self.apply_btn.draw()
-        self.back_btn.draw()
-        self.restart_btn.draw()
+        # Background, labels, selectors and buttons (one cached texture)
+        self.static_layer.draw()
         
         # Z-ORDER: Draw options LAST so they appear on top
         if self.camera_selector.expanded:
             self.camera_selector.draw_options()
         if self.res_selector.expanded:
             self.res_selector.draw_options()
+        if self.filter_selector.expanded:
+            self.filter_selector.draw_options()
+
+        self._dirty = False
 
     def on_enter(self, **context_data):
         # Refresh values from settings in case they changed
-        pass
+        self._dirty = True
 
     def on_exit(self):
         pass
+
+    def cleanup(self):
+        self.static_layer.cleanup()
+        self.background.cleanup()
+        for widget in (self.title, self.cam_label, self.camera_selector, self.res_label,
+                       self.res_selector, self.filter_label, self.filter_selector,
+                       self.apply_btn, self.back_btn, self.restart_btn):
+            widget.cleanup()
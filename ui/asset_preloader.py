@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+from ui.texture_cache import TextureCache
+from utils.logger import get_logger
+
+logger = get_logger("AssetPreloader")
+
+
+class AssetPreloader:
+    """
+    Decodes a list of assets in a thread pool and uploads them to the
+    TextureCache on the render thread.
+
+    Specs are (path, size, transform) tuples as accepted by TextureCache.acquire().
+    PNG decoding and smoothscale release the GIL, so the workers run in parallel.
+    Call poll() from the render thread until done is True.
+    """
+
+    def __init__(self, cache, specs, max_workers=None):
+        self.cache = cache
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+        # Drop duplicates and anything already cached
+        self.specs = []
+        seen = set()
+        for path, size, transform in specs:
+            key = TextureCache.make_key(path, size, transform)
+            if key in seen or key in cache.entries:
+                continue
+            seen.add(key)
+            self.specs.append((path, size, transform))
+
+        self.total = len(self.specs)
+        self.completed = 0
+        self._executor = None
+        self._pending = []
+
+    def start(self):
+        """Submits all decode jobs."""
+        if not self.specs:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="AssetDecode")
+        self._pending = [
+            (spec, self._executor.submit(self.cache.build_surface, *spec))
+            for spec in self.specs
+        ]
+        logger.info(f"Preloading {self.total} assets on {self.max_workers} threads...")
+
+    @property
+    def done(self):
+        return self.completed >= self.total
+
+    @property
+    def progress(self):
+        """Fraction of assets uploaded (0.0 - 1.0)."""
+        if self.total == 0:
+            return 1.0
+        return self.completed / self.total
+
+    def poll(self, timeout=None):
+        """
+        Uploads finished decodes (render thread only).
+        With a timeout, waits up to that many seconds for at least one result.
+        Returns the current progress.
+        """
+        if timeout and self._pending:
+            wait_futures([f for _, f in self._pending], timeout=timeout, return_when=FIRST_COMPLETED)
+
+        still_pending = []
+        for spec, future in self._pending:
+            if not future.done():
+                still_pending.append((spec, future))
+                continue
+
+            self.completed += 1
+            try:
+                self.cache.insert(*spec, future.result())
+            except Exception as e:
+                # The screen will try (and log) again when it loads the asset
+                logger.warn(f"Failed to preload '{spec[0]}': {e}")
+        self._pending = still_pending
+
+        if self.done:
+            self.shutdown()
+        return self.progress
+
+    def wait(self, on_progress=None):
+        """Blocks until all assets are uploaded, calling on_progress(fraction) as they arrive."""
+        self.start()
+        while not self.done:
+            progress = self.poll(timeout=0.05)
+            if on_progress:
+                on_progress(progress)
+        self.shutdown()
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
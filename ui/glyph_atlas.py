@@ -0,0 +1,172 @@
+import weakref
+import pygame
+from pygame._sdl2 import Texture
+from ui.texture_cache import get_texture_cache
+from utils.logger import get_logger
+
+logger = get_logger("GlyphAtlas")
+
+
+class GlyphAtlas:
+    """
+    Rasterizes the glyphs of one font (face + size) once into atlas textures.
+
+    Strings are laid out as runs of (page, srcrect, dstrect offset) and drawn as
+    one sub-rect blit per glyph, so changing text never allocates textures.
+    Glyphs are stored in white and tinted with the texture color when drawn.
+    Kerning comes from the font itself: the advance of a glyph followed by
+    another is size(a + b) - size(b).
+    """
+
+    PAGE_SIZE = 512
+    PADDING = 1 # Empty pixels between glyphs to avoid sampling neighbours
+
+    def __init__(self, renderer, font):
+        self.renderer = renderer
+        # Weak, so the atlas doesn't keep its font (the registry key) alive
+        self._font_ref = weakref.ref(font)
+        self.line_height = font.get_height()
+
+        self.pages = [] # Textures
+        self.page_surfaces = [] # CPU copies the glyphs are packed into
+        self._dirty_pages = set()
+        self.glyphs = {} # char -> (page index, pygame.Rect in page)
+        self.advances = {} # (char, next char) -> kerned advance
+        self.widths = {} # char -> rendered width (advance of the last glyph in a run)
+
+        # Shelf packer state for the current page
+        self._shelf_x = 0
+        self._shelf_y = 0
+        self._shelf_h = 0
+
+        # Page memory is accounted in the texture cache while the atlas lives
+        self._memory_key = ('glyph_atlas', id(self))
+        weakref.finalize(self, get_texture_cache(renderer).untrack, self._memory_key)
+
+    @property
+    def font(self):
+        return self._font_ref()
+
+    def _new_page(self):
+        texture = Texture(self.renderer, (self.PAGE_SIZE, self.PAGE_SIZE))
+        texture.blend_mode = 1 # SDL_BLENDMODE_BLEND
+        self.pages.append(texture)
+        get_texture_cache(self.renderer).track(self._memory_key, (self.PAGE_SIZE, self.PAGE_SIZE * len(self.pages)))
+        self.page_surfaces.append(pygame.Surface((self.PAGE_SIZE, self.PAGE_SIZE), pygame.SRCALPHA))
+        self._dirty_pages.add(len(self.pages) - 1)
+        self._shelf_x = 0
+        self._shelf_y = 0
+        self._shelf_h = 0
+
+    def _add_glyph(self, char):
+        """Rasterizes one glyph and uploads it into the atlas."""
+        surface = self.font.render(char, True, (255, 255, 255))
+        w, h = surface.get_size()
+
+        if not self.pages:
+            self._new_page()
+        if self._shelf_x + w > self.PAGE_SIZE:
+            # Next shelf
+            self._shelf_x = 0
+            self._shelf_y += self._shelf_h + self.PADDING
+            self._shelf_h = 0
+        if self._shelf_y + h > self.PAGE_SIZE:
+            self._new_page()
+
+        rect = pygame.Rect(self._shelf_x, self._shelf_y, w, h)
+        if w > 0 and h > 0:
+            self.page_surfaces[-1].blit(surface, rect)
+            self._dirty_pages.add(len(self.pages) - 1)
+
+        self._shelf_x += w + self.PADDING
+        self._shelf_h = max(self._shelf_h, h)
+
+        glyph = (len(self.pages) - 1, rect)
+        self.glyphs[char] = glyph
+        self.widths[char] = w
+        return glyph
+
+    def _advance(self, char, next_char):
+        key = (char, next_char)
+        advance = self.advances.get(key)
+        if advance is None:
+            advance = self.font.size(char + next_char)[0] - self.font.size(next_char)[0]
+            self.advances[key] = advance
+        return advance
+
+    def _upload_dirty_pages(self):
+        # Texture.update() can't target a sub-rect reliably, re-upload whole pages.
+        # This only happens when new glyphs were added.
+        for index in self._dirty_pages:
+            self.pages[index].update(self.page_surfaces[index])
+        self._dirty_pages.clear()
+
+    def layout(self, text):
+        """
+        Lays out a string. Returns (run, width, height) where run is a list of
+        (page index, srcrect, x offset) entries.
+        """
+        run = []
+        x = 0
+        last = len(text) - 1
+        for i, char in enumerate(text):
+            glyph = self.glyphs.get(char)
+            if glyph is None:
+                try:
+                    glyph = self._add_glyph(char)
+                except pygame.error as e:
+                    logger.error(f"Error rendering glyph {char!r}: {e}")
+                    continue
+
+            page, src = glyph
+            if src.width > 0:
+                run.append((page, src, x))
+
+            if i < last:
+                x += self._advance(char, text[i + 1])
+            else:
+                x += self.widths[char]
+
+        if self._dirty_pages:
+            self._upload_dirty_pages()
+        return run, x, self.line_height
+
+    def draw_run(self, run, position, color=(255, 255, 255), alpha=255):
+        """Draws a laid-out run with its top-left at 'position'."""
+        self.draw_placed(self.place_run(run, position), color, alpha)
+
+    def place_run(self, run, position):
+        """
+        Resolves a run at 'position' into (page texture, srcrect, dstrect) draws.
+        Keep the result while text and position are unchanged to draw without allocating.
+        """
+        px, py = position
+        return [
+            (self.pages[page], src, pygame.FRect(px + x, py, src.width, src.height))
+            for page, src, x in run
+        ]
+
+    def draw_placed(self, placed, color=(255, 255, 255), alpha=255):
+        """Draws glyphs resolved by place_run()."""
+        for page in self.pages:
+            page.color = color
+            page.alpha = alpha
+        for texture, src, dst in placed:
+            texture.draw(srcrect=src, dstrect=dst)
+
+
+# Global factory (one atlas per renderer and font, dropped with the font)
+_atlases = {}
+
+def get_glyph_atlas(renderer, font):
+    key = id(renderer)
+    per_renderer = _atlases.get(key)
+    if per_renderer is None or per_renderer[0] is not renderer:
+        per_renderer = (renderer, weakref.WeakKeyDictionary())
+        _atlases[key] = per_renderer
+
+    atlas = per_renderer[1].get(font)
+    if atlas is None:
+        atlas = GlyphAtlas(renderer, font)
+        per_renderer[1][font] = atlas
+    return atlas
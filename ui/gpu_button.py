@@ -5,6 +5,9 @@ from ui.gpu_text_label import GPUTextLabel
 
 class GPUImageButton:
     """A button that can contain an image or text and handles clicks."""
+
+    __slots__ = ('renderer', 'rect', 'image', 'label', '_bg_color', '_border_radius', '_bg_texture')
+
     def __init__(self, renderer, text=None, image_path=None, position=(0,0), font=None, color=(255,255,255), size=None, border_radius=0):
         self.renderer = renderer
         self.rect = pygame.Rect(position[0], position[1], 1, 1) # Placeholder
@@ -16,9 +19,7 @@ class GPUImageButton:
         
         # Priority: Image > Text
         if image_path:
-            self.image = GPUImage(renderer, image_path, position)
-            if size:
-                self.image.resize(size[0], size[1])
+            self.image = GPUImage(renderer, image_path, position, size=size)
             if self.image.image_rect:
                 self.rect = self.image.image_rect
         elif text:
@@ -116,3 +117,11 @@ class GPUImageButton:
             self.image.draw()
         if self.label:
             self.label.draw()
+
+    def cleanup(self):
+        """Releases the image, label and background textures."""
+        if self.image:
+            self.image.cleanup()
+        if self.label:
+            self.label.cleanup()
+        self._bg_texture = None
@@ -1,76 +1,173 @@
-
+import os
 import pygame
 from pygame._sdl2 import Texture
+from ui.texture_cache import get_texture_cache
 from utils.logger import get_logger
 
 logger = get_logger("GPUImage")
 
+
 class GPUImage:
     """
     Renders and manages an image as a hardware-accelerated texture using Pygame-CE's SDL2 Renderer.
+    Textures are shared through the TextureCache: images with the same path, size
+    and transform use the same GPU texture. Shared textures may be evicted under
+    memory pressure; 'texture' transparently restores them.
+
+    The destination rect is cached until scale, position or
+    image change, so draw() allocates nothing. Move the image with
+    set_position() rather than by editing image_rect.
+
+    'image_path' can also be an in-memory image (PIL image, numpy array,
+    Surface or encoded bytes, see ImageUtils.to_surface()); 'name' lets images
+    built from the same pixels share their texture.
     """
-    
-    def __init__(self, renderer, image_path, position=(0, 0)):
+
+    __slots__ = (
+        'renderer', 'image_path', 'name', 'position', 'surface', 'image_rect',
+        '_cache', '_entry', '_texture',
+        '_alpha', '_scale', '_scaled_rect', '_draw_rect', '_draw_dirty',
+    )
+
+    def __init__(self, renderer, image_path, position=(0, 0), size=None, transform='smoothscale', name=None):
         self.renderer = renderer
-        self.image_path = image_path
+        self.image_path = image_path # Path or in-memory image
+        self.name = name
         self.position = position # (x, y)
-        
-        self.surface = None 
-        self.texture = None
-        self.image_rect = None 
-        
+
+        self.surface = None # CPU copy, only kept for private textures
+        self.image_rect = None
+        self._cache = get_texture_cache(renderer)
+        self._entry = None # Shared cache entry (None for private textures)
+        self._texture = None # Private texture
+
         # Animation properties
-        self.alpha = 255
-        self.scale = 1.0
-        
+        self._alpha = 255
+        self._scale = 1.0
+
+        # Cached draw state (see _update_draw_state)
+        self._scaled_rect = pygame.FRect(0, 0, 0, 0) # Reused for scaled draws
+        self._draw_rect = None
+        self._draw_dirty = True
+
         # Load immediately
-        self.load_image(self.image_path)
+        if size is None:
+            self.load_image(self.image_path)
+        else:
+            self.load_image(self.image_path, size, transform)
 
-    def load_image(self, path):
-        """Loads the image from disk and creates the GPU texture."""
+    def load_image(self, path, size=None, transform=None, name=None):
+        """
+        Acquires the (optionally resized) image from the texture cache.
+        'path' is a file path or an in-memory image named 'name' (see class docs).
+        """
+        if name is not None:
+            self.name = name
+        elif path is not self.image_path:
+            self.name = None # A different image, don't share the old one's texture
         try:
-            # 1. Load Surface
-            self.surface = pygame.image.load(path)
-            
-            # 2. Update Rect
-            self.image_rect = self.surface.get_rect(topleft=self.position)
-            
-            # 3. Create GPU Texture
-            self.update_texture()
-            
-            return True
-        except pygame.error as e:
-            logger.error(f"Error loading image '{path}': {e}")
-            self.surface = None
+            entry = self._acquire(path, size, transform)
+        except (pygame.error, FileNotFoundError, TypeError, ValueError) as e:
+            logger.error(f"Error loading image '{self._describe(path)}': {e}")
             return False
 
-    def resize(self, new_width, new_height):
+        self.image_path = path
+        if entry.key[0] == 'memory':
+            self.name = entry.key[1] # Resized levels share the generated name
+        self._set_entry(entry)
+        return True
+
+    def _acquire(self, path, size, transform):
+        if isinstance(path, (str, os.PathLike)):
+            return self._cache.acquire(path, size, transform)
+        return self._cache.acquire_memory(path, size, transform, self.name)
+
+    def _describe(self, path):
+        if isinstance(path, (str, os.PathLike)):
+            return path
+        return self.name or type(path).__name__
+
+    @property
+    def alpha(self):
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, alpha):
+        self._alpha = int(max(0, min(255, alpha)))
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale):
+        if scale != self._scale:
+            self._scale = scale
+            self._draw_dirty = True
+
+    @property
+    def texture(self):
+        """The GPU texture (restored first if the cache evicted it)."""
+        entry = self._entry
+        if entry is None:
+            return self._texture
+        if entry.texture is None:
+            self._cache.restore(entry)
+        return entry.texture
+
+    @texture.setter
+    def texture(self, texture):
+        self._texture = texture
+
+    @property
+    def cache_key(self):
+        """Key of the shared texture, or None for private textures."""
+        return self._entry.key if self._entry else None
+
+    def _set_entry(self, entry):
+        """Switches to a new cache entry, releasing the previous one."""
+        old_entry = self._entry
+        self._entry = entry
+        self.surface = None
+        self._texture = None
+        self.image_rect = pygame.Rect(self.position, entry.size)
+        self._draw_dirty = True
+        self._cache.release(old_entry)
+
+    def resize(self, new_width, new_height, transform='smoothscale'):
         """
-        Scales the underlying surface and updates the texture.
+        Swaps to a resized version of the image.
         Use this for one-time resizing (e.g. initialization).
         For real-time zooming, use draw scaling.
         """
-        if not self.surface:
+        if self._entry is not None:
+            self.load_image(self.image_path, (new_width, new_height), transform)
             return
 
-        self.surface = pygame.transform.smoothscale(
-            self.surface, 
-            (int(new_width), int(new_height))
-        )
-        self.update_texture()
+        if self.surface:
+            # Private surface: scale it locally
+            self.surface = self._cache.transform_surface(
+                self.surface, (int(new_width), int(new_height)), transform
+            )
+            self.update_texture()
 
     def update_texture(self):
-        """Uploads the current surface to the GPU."""
+        """Uploads the current surface to a private (unshared) GPU texture."""
         if not self.surface:
             return
-            
+
         try:
+            # Detach from the shared entry, the surface is ours now
+            self._cache.release(self._entry)
+            self._entry = None
+
             # Create a static texture (access=0 default)
             self.texture = Texture.from_surface(self.renderer, self.surface)
             # Enable alpha blending (1 = SDL_BLENDMODE_BLEND)
             self.texture.blend_mode = 1
             # Update rect size in case of resize
             self.image_rect = self.surface.get_rect(topleft=self.position)
+            self._draw_dirty = True
         except Exception as e:
             logger.error(f"Failed to create texture: {e}")
 
@@ -79,28 +176,47 @@ class GPUImage:
         self.position = position
         if self.image_rect:
             self.image_rect.topleft = position
+            self._draw_dirty = True
+
+    def _update_draw_state(self):
+        """Recomputes the destination rect for the current scale."""
+        scale = self._scale
+        rect = self.image_rect
+        if scale == 1.0 or rect is None:
+            self._draw_rect = rect
+        else:
+            # Scaled rect centered at original position center
+            w = int(rect.width * scale)
+            h = int(rect.height * scale)
+            self._scaled_rect.update(rect.centerx - w // 2, rect.centery - h // 2, w, h)
+            self._draw_rect = self._scaled_rect
+        self._draw_dirty = False
 
     def draw(self):
         """Draws the texture to the renderer with current scale and alpha."""
-        if not self.texture:
-            return
-            
-        # Update texture alpha
-        self.texture.alpha = int(max(0, min(255, self.alpha)))
-        
-        if self.scale == 1.0:
-            self.texture.draw(dstrect=self.image_rect)
+        if self._draw_dirty:
+            self._update_draw_state()
+
+        entry = self._entry
+        if entry is None:
+            texture = self._texture
         else:
-            # Calculate scaled rect centered at original position center
-            w = int(self.image_rect.width * self.scale)
-            h = int(self.image_rect.height * self.scale)
-            cx, cy = self.image_rect.center
-            scaled_rect = pygame.Rect(cx - w//2, cy - h//2, w, h)
-            self.texture.draw(dstrect=scaled_rect)
+            texture = entry.texture
+            if texture is None:
+                self._cache.restore(entry)
+                texture = entry.texture
+            entry.last_drawn = self._cache.frame
+        if texture is None:
+            return
+
+        # Shared textures: always set alpha before drawing
+        texture.alpha = self._alpha
+        texture.draw(dstrect=self._draw_rect)
 
     def cleanup(self):
-        """Releases the texture."""
-        if self.texture:
-            # Pygame textures are auto-collected, but explicit is fine
-            del self.texture
-            self.texture = None
+        """Releases the texture (returns the shared entry to the cache)."""
+        self._cache.release(self._entry)
+        self._entry = None
+        self.surface = None
+        self._texture = None
+
@@ -1,61 +1,183 @@
-
+from functools import partial
 import pygame
-from utils.image_utils import ImageUtils
 from ui.gpu_image import GPUImage
+from ui.render_target import render_to
+from ui.texture_cache import get_texture_cache
+
+
+def mip_level_for_scale(scale, levels):
+    """Index of the smallest pyramid level still at least as large as the drawn size (0 = full size)."""
+    level = 0
+    while level < levels and scale <= 0.5:
+        scale *= 2
+        level += 1
+    return level
+
 
 class GPUPolaroid:
     """
     Combines a photo and a frame into a Polaroid-effect using GPU Textures.
+
+    Frame and photo are baked once into a single render-target texture
+    (premultiplied alpha), so drawing is one rotated blit. The bake is shared
+    between polaroids with the same photo and size, and redone on set_photo().
+    Half, quarter, ... size levels of the composite are rendered from it on the
+    GPU; polaroids drawn shrunk (set_scale) sample the closest one.
+
+    The destination rect, rotation origin and level are cached until position,
+    scale or the baked texture change, so draw() allocates nothing.
+
+    The photo can be a path or an in-memory image (see GPUImage), so a captured
+    frame becomes a polaroid without a round trip through the disk.
     """
 
-    def __init__(self, renderer, photo_path, size=448):
+    __slots__ = (
+        'renderer', 'rotation_angle', 'position', 'factor',
+        'frame_padding_top', 'frame_padding_sides', 'frame_padding_bottom',
+        'photo_width', 'photo_height', 'photo', 'frame', 'texture',
+        '_scale', '_baked_entry', '_mip_entries',
+        '_draw_texture', '_draw_rect', '_origin', '_draw_dirty',
+    )
+
+    FRAME_PATH = "assets/images/polaroid-frame.png"
+
+    # Frame paddings for the 448px reference photo
+    PADDING_TOP = 130
+    PADDING_SIDES = 153
+    PADDING_BOTTOM = 350
+
+    MIP_MIN_SIZE = 32 # Smallest side of the last pyramid level
+    MAX_MIP_LEVELS = 4
+
+    def __init__(self, renderer, photo_path, size=448, name=None):
         self.renderer = renderer
-        self.rotation_angle = 0.0 
+        self.rotation_angle = 0.0
         self.position = (0, 0)
-        
+        self._scale = 1.0
+
+        # Cached draw state (see _update_draw_state)
+        self._draw_texture = None
+        self._draw_rect = pygame.FRect(0, 0, 0, 0)
+        self._origin = (0, 0)
+        self._draw_dirty = True
+
         # 448 is the reference original photo width
-        self.factor = float(size / 448) 
-        
-        self.frame_padding_top = int(130 * self.factor)
-        self.frame_padding_sides = int(153 * self.factor)
-        self.frame_padding_bottom = int(350 * self.factor)
-        
+        self.factor = float(size / 448)
+
+        self.frame_padding_top = int(self.PADDING_TOP * self.factor)
+        self.frame_padding_sides = int(self.PADDING_SIDES * self.factor)
+        self.frame_padding_bottom = int(self.PADDING_BOTTOM * self.factor)
+
         # --- PHOTO ---
         self.photo_width = int(size)
         self.photo_height = int(size)
-        
-        self.photo = GPUImage(renderer, photo_path)
-        
-        # Crop and Resize Photo Surface
-        if self.photo.surface:
-            self.photo.surface = ImageUtils.resize_and_crop_to_fit(
-                self.photo.surface,
-                new_width=self.photo_width,
-                new_height=self.photo_height
-            )
-            self.photo.update_texture()
-            
+
+        # Cropped to a square by the shared texture cache
+        self.photo = GPUImage(
+            renderer, photo_path,
+            size=(self.photo_width, self.photo_height),
+            transform='cover', name=name
+        )
+
         # --- FRAME ---
-        frame_path = "assets/images/polaroid-frame.png"
         frame_w_ref = self.frame_padding_sides * 2 + self.photo_width
         frame_h_ref = self.frame_padding_top + self.frame_padding_bottom + self.photo_height
-        
-        self.frame = GPUImage(renderer, frame_path)
-        if self.frame.surface:
-             self.frame.surface = pygame.transform.scale(
-                self.frame.surface, (frame_w_ref, frame_h_ref)
+
+        self.frame = GPUImage(renderer, self.FRAME_PATH, size=(frame_w_ref, frame_h_ref), transform='scale')
+
+        # --- COMPOSITE ---
+        self.texture = None
+        self._baked_entry = None
+        self._mip_entries = []
+        self._draw_dirty = True
+        self.bake()
+
+    @classmethod
+    def asset_specs(cls, photo_path, size=448):
+        """Texture cache specs (path, size, transform) a polaroid of this size loads."""
+        factor = float(size / 448)
+        photo = int(size)
+        frame_w = int(cls.PADDING_SIDES * factor) * 2 + photo
+        frame_h = int(cls.PADDING_TOP * factor) + int(cls.PADDING_BOTTOM * factor) + photo
+        return [
+            (photo_path, (photo, photo), 'cover'),
+            (cls.FRAME_PATH, (frame_w, frame_h), 'scale'),
+        ]
+
+    def bake(self):
+        """Composites frame and photo into the shared render-target texture."""
+        if not self.frame.texture:
+            return
+
+        # Private textures can't be shared, key them on this polaroid
+        key = (
+            'baked', 'polaroid',
+            self.frame.cache_key or id(self),
+            self.photo.cache_key or id(self),
+        )
+
+        cache = get_texture_cache(self.renderer)
+        entry = cache.acquire_baked(key, self.frame.image_rect.size, self._draw_composite, linear=True)
+
+        # Each level is downsampled (linear filter, 2x2 average) from the previous one
+        levels = []
+        source = entry
+        w, h = self.frame.image_rect.size
+        while len(levels) < self.MAX_MIP_LEVELS and min(w, h) // 2 >= self.MIP_MIN_SIZE:
+            w, h = w // 2, h // 2
+            source = cache.acquire_baked(
+                key + ('mip', len(levels) + 1), (w, h),
+                partial(self._draw_downsampled, source.texture), linear=True
             )
-             self.frame.update_texture()
-             
+            levels.append(source)
+
+        self._release_baked()
+        self._baked_entry = entry
+        self._mip_entries = levels
+        self.texture = entry.texture
+        self._draw_dirty = True
+
+    def _release_baked(self):
+        cache = get_texture_cache(self.renderer)
+        cache.release(self._baked_entry)
+        for level in self._mip_entries:
+            cache.release(level)
+        self._baked_entry = None
+        self._mip_entries = []
+
+    def _draw_composite(self, texture):
+        """Draws the frame and the photo (top-left at 0, 0) into the current target."""
+        with render_to(self.renderer, texture):
+            self.frame.texture.alpha = 255
+            self.frame.texture.draw(dstrect=(0, 0) + self.frame.image_rect.size)
+            if self.photo.texture:
+                self.photo.texture.alpha = 255
+                self.photo.texture.draw(dstrect=(
+                    self.frame_padding_sides, self.frame_padding_top,
+                    self.photo.image_rect.width, self.photo.image_rect.height
+                ))
+
+    def _draw_downsampled(self, source, texture):
+        """Draws 'source' scaled down to fill 'texture' (both premultiplied)."""
+        with render_to(self.renderer, texture):
+            source.alpha = 255
+            source.draw(dstrect=(0, 0, texture.width, texture.height))
+
+    def set_photo(self, photo_path, name=None):
+        """Swaps the photo (path or in-memory image) and re-bakes the composite."""
+        self.photo.load_image(photo_path, (self.photo_width, self.photo_height), 'cover', name)
+        self.bake()
+
     def set_position(self, position):
         """Sets the top-left position of the Frame."""
         self.position = position
-        
+        self._draw_dirty = True
+
         frame_x, frame_y = position
-        
+
         # Update Frame
         self.frame.set_position((frame_x, frame_y))
-        
+
         # Update Photo
         photo_x = frame_x + self.frame_padding_sides
         photo_y = frame_y + self.frame_padding_top
@@ -64,89 +186,50 @@ class GPUPolaroid:
     def set_rotation(self, angle):
         self.rotation_angle = angle
 
+    def set_transform(self, position, angle):
+        """Sets position and rotation in one call (used for bulk layout updates)."""
+        self.set_position(position)
+        self.rotation_angle = angle
+
+    @property
+    def scale(self):
+        return self._scale
+
     def set_scale(self, scale):
-        self.scale = scale
+        if scale != self._scale:
+            self._scale = scale
+            self._draw_dirty = True
+
+    def _update_draw_state(self):
+        """Recomputes the destination rect, rotation origin and level to sample."""
+        scale = self._scale
+        texture = self.texture
+        if texture is not None and scale <= 0.5 and self._mip_entries:
+            texture = self._mip_entries[mip_level_for_scale(scale, len(self._mip_entries)) - 1].texture
+        self._draw_texture = texture
+        self._draw_dirty = False
+        if texture is None:
+            return
+
+        # Scale shrinks towards the top-left of the frame (used for "falling")
+        frame_w = int(self.frame.image_rect.width * scale)
+        frame_h = int(self.frame.image_rect.height * scale)
+        self._draw_rect.update(self.position[0], self.position[1], frame_w, frame_h)
+        self._origin = (frame_w // 2, frame_h // 2)
 
     def draw(self):
-        """Draws the rotated polaroid."""
-        if not self.frame.image_rect or not self.photo.image_rect:
+        """Draws the rotated polaroid as a single blit of the baked texture."""
+        if self._draw_dirty:
+            self._update_draw_state()
+
+        texture = self._draw_texture
+        if texture is None:
             return
+        texture.draw(dstrect=self._draw_rect, angle=self.rotation_angle, origin=self._origin)
 
-        # Apply Scale
-        current_scale = getattr(self, 'scale', 1.0)
-        
-        # Frame
-        frame_w = int(self.frame.image_rect.width * current_scale)
-        frame_h = int(self.frame.image_rect.height * current_scale)
-        
-        # Rect for drawing
-        frame_dst = (
-            self.frame.image_rect.x, 
-            self.frame.image_rect.y, 
-            frame_w, 
-            frame_h
-        )
-        
-        # Photo
-        photo_w = int(self.photo.image_rect.width * current_scale)
-        photo_h = int(self.photo.image_rect.height * current_scale)
-        
-        # We need to render the photo at the correct relative position
-        # The positions set in object are Top-Left unscaled.
-        # But wait, if we scale, we usually scale around center or logical origin?
-        # The `set_position` sets the Top-Left of the FRAME.
-        # If we just scale the W/H, the Top-Left remains, so it shrinks towards Top-Left.
-        # This is acceptable for "falling", we just adjust Target X/Y.
-        
-        photo_dst = (
-            self.photo.image_rect.x, # Photo absolute X (calculated in set_pos)
-            self.photo.image_rect.y, 
-            photo_w, 
-            photo_h
-        )
-        
-        # BUT: The relative offset of photo inside frame must also scale.
-        # self.photo.image_rect.x is FrameX + PaddingSides.
-        # If we scale, the visual padding shrinks.
-        # So we must recalculate the Photo DST X/Y based on Scaled Padding.
-        
-        # Recalculate offsets based on scale
-        scaled_sides = int(self.frame_padding_sides * current_scale)
-        scaled_top = int(self.frame_padding_top * current_scale)
-        
-        photo_dst_x = self.frame.image_rect.x + scaled_sides
-        photo_dst_y = self.frame.image_rect.y + scaled_top
-        
-        photo_dst = (photo_dst_x, photo_dst_y, photo_w, photo_h)
-
-        # Origins for Rotation (Centers of the SCALED rects)
-        origin_frame = (frame_w // 2, frame_h // 2)
-        
-        # Frame Center (SCALED) relative to Photo Top-Left (SCALED)
-        frame_center_x = self.frame.image_rect.x + (frame_w // 2)
-        frame_center_y = self.frame.image_rect.y + (frame_h // 2)
-        
-        origin_photo = (
-            frame_center_x - photo_dst_x,
-            frame_center_y - photo_dst_y
-        )
-        
-        # Draw Frame
-        if self.frame.texture:
-            self.frame.texture.draw(
-                dstrect=frame_dst,
-                angle=self.rotation_angle,
-                origin=origin_frame
-            )
-            
-        # Draw Photo
-        if self.photo.texture:
-            self.photo.texture.draw(
-                dstrect=photo_dst,
-                angle=self.rotation_angle,
-                origin=origin_photo
-            )
-            
     def cleanup(self):
+        self._release_baked()
+        self.texture = None
         self.frame.cleanup()
         self.photo.cleanup()
+
@@ -123,3 +123,9 @@ class GPUSelector:
             # Outer Border for list
             self.renderer.draw_color = self.border_color
             self.renderer.draw_rect(list_rect)
+
+    def cleanup(self):
+        """Releases the textures of all buttons."""
+        self.main_button.cleanup()
+        for _, btn in self.option_buttons:
+            btn.cleanup()
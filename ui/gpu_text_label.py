@@ -1,50 +1,62 @@
-
 import pygame
-from pygame._sdl2 import Texture
+from ui.glyph_atlas import get_glyph_atlas
 from utils.logger import get_logger
 
 logger = get_logger("GPUTextLabel")
 
 class GPUTextLabel:
-    """Renders text as a GPU Texture."""
+    """
+    Renders text from a shared glyph atlas (see GlyphAtlas).
+    Changing the text only re-lays out glyphs, no textures are created.
+    Glyph destinations are resolved once per text/position change.
+    """
+
+    __slots__ = ('renderer', 'font', 'color', 'alpha', 'position', 'atlas', 'text', 'run', 'rect', '_placed')
     
     def __init__(self, renderer, initial_text="Default", font=None, color=(255, 255, 255)):
         self.renderer = renderer
         self.font = font or pygame.font.Font(None, 20)
         self.color = color
+        self.alpha = 255
         self.position = (0, 0)
         
-        self.surface = None
-        self.texture = None
+        self.atlas = get_glyph_atlas(renderer, self.font)
+        self.text = None
+        self.run = []
         self.rect = None
+        self._placed = None # (page texture, srcrect, dstrect) per glyph
         
         self.update_text(initial_text)
 
     def update_text(self, text):
-        """Creates new surface and texture from text."""
+        """Lays out the text with the glyph atlas (no-op if unchanged)."""
+        if text == self.text:
+            return
+
         try:
-            self.surface = self.font.render(text, True, self.color)
-            self.rect = self.surface.get_rect(topleft=self.position)
-            
-            # Create/Update Texture
-            if self.renderer:
-                if self.texture:
-                    del self.texture 
-                self.texture = Texture.from_surface(self.renderer, self.surface)
-                
+            self.run, width, height = self.atlas.layout(text)
+            self.text = text
+            self._placed = None
+            if self.rect:
+                self.rect.size = (width, height)
+            else:
+                self.rect = pygame.Rect(self.position, (width, height))
         except pygame.error as e:
             logger.error(f"Error rendering text: {e}")
 
     def set_position(self, position):
         self.position = position
+        self._placed = None
         if self.rect:
             self.rect.topleft = position
 
     def draw(self):
-        if self.texture and self.rect:
-            self.texture.draw(dstrect=self.rect)
+        if self.run and self.rect:
+            if self._placed is None:
+                self._placed = self.atlas.place_run(self.run, self.rect.topleft)
+            self.atlas.draw_placed(self._placed, self.color, self.alpha)
 
     def cleanup(self):
-        if self.texture:
-            del self.texture
-            self.texture = None
+        # Glyphs stay in the shared atlas for other labels using this font
+        self.run = []
+        self._placed = None
@@ -1,13 +1,79 @@
+import threading
+import time
+import numpy as np
 import pygame
 from pygame._sdl2 import Texture
+from cameras.camera_interface import notify_new_frame
+from utils.color_filters import get_color_filter
 from utils.logger import get_logger
+from ui.texture_cache import get_texture_cache
+from utils.quality_governor import get_quality_governor
 
 logger = get_logger("LivePreview")
 
+
+class _FrameFilter:
+    """
+    Applies the color filter look to live view frames on a background thread.
+    Holds one pending frame (newer frames replace it) and one result, so it
+    never queues up behind the camera.
+    """
+
+    def __init__(self):
+        self._pending = None # (image, lut)
+        self._result = None # (size, packed pixels)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="PreviewFilter", daemon=True)
+        self._thread.start()
+
+    def submit(self, image, lut):
+        with self._lock:
+            self._pending = (image, lut)
+        self._wake.set()
+
+    def take(self):
+        """The latest filtered frame as (size, pixels), or None if none is new."""
+        with self._lock:
+            result, self._result = self._result, None
+        return result
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop:
+                return
+            with self._lock:
+                pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            image, lut = pending
+            try:
+                pixels = lut.preview_pixels(np.asarray(image.convert("RGB") if image.mode != "RGB" else image))
+            except Exception as e:
+                logger.error(f"Preview filter failed: {e}")
+                continue
+            with self._lock:
+                self._result = (image.size, pixels)
+            # Wake an idle main loop to show it
+            notify_new_frame()
+
+    def stop(self):
+        self._stop = True
+        self._wake.set()
+
 class LivePreview:
     """
     Handles the conversion of camera frames to GPU textures 
     and manages 'Crop-to-Fill' logic for a specific display area.
+    Frames are uploaded at most 'preview_fps' times per second (quality governor)
+    and only when the camera delivered a new one.
+
+    With a color filter look, frames are mapped through its LUT on a
+    background thread (nearest lookup on the reduced-size live view frame);
+    the render thread only uploads the result, one frame later.
     """
     
     def __init__(self, renderer, display_width, display_height):
@@ -23,6 +89,10 @@ class LivePreview:
         self.tex_w = 0
         self.tex_h = 0
 
+        self._last_image = None
+        self._last_upload = 0.0
+        self._filter = None # _FrameFilter, started with the first filtered frame
+
     def _calculate_crop(self, frame_w, frame_h):
         """Calculates the srcrect to center-crop the camera frame to the screen ratio."""
         frame_ratio = frame_w / frame_h
@@ -40,23 +110,48 @@ class LivePreview:
 
     def update(self, pil_image):
         """Updates the GPU texture with a new PIL image."""
-        if pil_image is None:
+        lut = get_color_filter().lut
+        if self._filter:
+            filtered = self._filter.take()
+            if filtered:
+                size, pixels = filtered
+                self._upload(pygame.image.frombuffer(pixels, size, 'RGBX'))
+
+        if pil_image is None or pil_image is self._last_image:
+            return
+
+        now = time.perf_counter()
+        if now - self._last_upload < 1.0 / get_quality_governor().get("preview_fps"):
+            return
+        self._last_image = pil_image
+        self._last_upload = now
+
+        if lut is not None:
+            if self._filter is None:
+                self._filter = _FrameFilter()
+            self._filter.submit(pil_image, lut)
             return
 
-        w, h = pil_image.size
+        # Note: pygame-ce Texture.update() can take a Surface
+        # Convert PIL to Surface quickly via bytes
+        self._upload(pygame.image.frombytes(pil_image.tobytes(), pil_image.size, pil_image.mode))
+
+    def _upload(self, surface):
+        """Uploads a frame to the streaming texture (recreated if the frame size changed)."""
+        w, h = surface.get_size()
 
         # 1. Initialize or Re-initialize texture if resolution changed
         if self.texture is None or w != self.tex_w or h != self.tex_h:
             self.tex_w, self.tex_h = w, h
             self._calculate_crop(w, h)
             
-            if self.texture:
-                # Proper cleanup for SDL2 textures
-                self.texture.destroy()
+            # Drop the old texture (pygame-ce frees it when unreferenced)
+            self.texture = None
             
             try:
                 self.texture = Texture(self.renderer, (w, h), streaming=True)
                 self.texture.blend_mode = 1
+                get_texture_cache(self.renderer).track(('live_preview', id(self)), (w, h))
                 logger.info(f"Created new {w}x{h} streaming texture.")
             except Exception as e:
                 logger.error(f"Texture creation failed: {e}")
@@ -64,10 +159,6 @@ class LivePreview:
 
         # 2. Upload Pixel Data
         try:
-            # Note: pygame-ce Texture.update() can take a Surface
-            # Convert PIL to Surface quickly via bytes
-            mode = pil_image.mode
-            surface = pygame.image.frombytes(pil_image.tobytes(), (w, h), mode)
             self.texture.update(surface)
         except Exception as e:
             logger.error(f"Texture update failed: {e}")
@@ -89,6 +180,9 @@ class LivePreview:
 
     def release(self):
         """Explicitly release GPU resources."""
-        if self.texture:
-            self.texture.destroy()
-            self.texture = None
\ No newline at end of file
+        self.texture = None
+        self._last_image = None
+        if self._filter:
+            self._filter.stop()
+            self._filter = None
+        get_texture_cache(self.renderer).untrack(('live_preview', id(self)))
\ No newline at end of file
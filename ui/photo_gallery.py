@@ -0,0 +1,151 @@
+import threading
+from collections import Counter, deque
+import pygame
+from ui.texture_cache import get_texture_cache
+from utils.logger import get_logger
+from utils.photo_store import get_photo_store
+from utils.rendition_pipeline import nearest_rendition
+
+logger = get_logger("PhotoGallery")
+
+
+class PhotoGallery:
+    """
+    Streams the most recent captures into a fixed number of display slots.
+
+    A background thread polls the PhotoStore for saved photos (newest first,
+    up to 'max_photos') and decodes the next few of them, from their smallest
+    rendition covering 'photo_size', into cover-cropped surfaces. The render
+    thread uploads at most one per take_ready() call, so frames pay for one
+    small texture upload at a time regardless of how many photos there are.
+
+    Photos captured after the gallery started are shown first, then the
+    collection is cycled. Surfaces are inserted into the TextureCache under the
+    photo's final path, so a GPUPolaroid of 'photo_size' picks them up with
+    set_photo(path). A photo that fails to decode leaves the collection and
+    is picked up again by the next poll, up to MAX_FAILURES times.
+    """
+
+    POLL_INTERVAL = 5.0 # Seconds between checks for new photos
+    PREFETCH = 3 # Photos decoded ahead of use
+    MAX_FAILURES = 3 # Decode failures before a photo is left out for good
+
+    def __init__(self, renderer, photo_size, max_photos=200):
+        self.cache = get_texture_cache(renderer)
+        self.size = (int(photo_size), int(photo_size))
+        self.max_photos = max_photos
+
+        self.photos = deque() # Rendition paths of the collection, newest first
+        self._known = {} # Photo ID -> rendition path, of the photos in the collection
+        self._failures = Counter() # Rendition path -> failed decodes
+        self._fresh = deque() # New photos, shown before the collection is cycled
+        self._ready = deque() # (path, surface) decoded, waiting for upload
+        self._polled = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name="PhotoGallery", daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        """Checks for new photos now (e.g. when a session just finished)."""
+        self._wake.set()
+
+    @property
+    def has_ready(self):
+        return bool(self._ready)
+
+    def take_ready(self):
+        """
+        Uploads the next decoded photo to the texture cache (render thread).
+        Returns its path, or None if nothing is ready.
+        """
+        try:
+            path, surface = self._ready.popleft()
+        except IndexError:
+            return None
+        self._wake.set() # Decode the next one
+        try:
+            self.cache.insert(path, self.size, 'cover', surface)
+        except pygame.error as e:
+            logger.error(f"Failed to upload gallery photo '{path}': {e}")
+            return None
+        return path
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._poll()
+                self._prefetch()
+            except Exception as e:
+                logger.error(f"Gallery update failed: {e}")
+            self._wake.wait(self.POLL_INTERVAL)
+            self._wake.clear()
+
+    def _poll(self):
+        """Adds photos saved since the last poll (those with renditions) to the collection."""
+        store = get_photo_store()
+        added = 0
+        for row in reversed(store.recent_photos(self.max_photos)):
+            if row["id"] in self._known:
+                continue
+            path = nearest_rendition(store.renditions(row["id"]), self.size)
+            if path is None:
+                continue # Renditions not written yet, next poll
+            with self._lock:
+                self._known[row["id"]] = path
+                self.photos.appendleft(path)
+                if self._polled:
+                    self._fresh.append(path)
+                if len(self.photos) > self.max_photos:
+                    self.photos.pop()
+            added += 1
+
+        if added:
+            logger.info(f"{added} photos added to the gallery ({len(self.photos)} total).")
+        self._polled = True
+
+    def _next_path(self):
+        with self._lock:
+            if self._fresh:
+                return self._fresh.popleft()
+            if not self.photos:
+                return None
+            # Cycle: the oldest shown goes to the back
+            path = self.photos.pop()
+            self.photos.appendleft(path)
+            return path
+
+    def _prefetch(self):
+        attempts = len(self.photos) + len(self._fresh)
+        while len(self._ready) < self.PREFETCH and attempts > 0:
+            attempts -= 1
+            path = self._next_path()
+            if path is None:
+                return
+            try:
+                surface = self.cache.build_surface(path, self.size, 'cover')
+            except (pygame.error, FileNotFoundError) as e:
+                self._drop(path, e)
+                continue
+            self._ready.append((path, surface))
+
+    def _drop(self, path, error):
+        """Takes a photo that failed to decode out of the collection (see MAX_FAILURES)."""
+        self._failures[path] += 1
+        retry = self._failures[path] < self.MAX_FAILURES
+        logger.warn(f"Skipping gallery photo '{path}'{', retrying later' if retry else ''}: {error}")
+        with self._lock:
+            if path in self.photos:
+                self.photos.remove(path)
+            if retry:
+                # Forgotten, so the next poll adds it again
+                for photo_id in [i for i, known in self._known.items() if known == path]:
+                    del self._known[photo_id]
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+        self._ready.clear()
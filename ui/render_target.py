@@ -0,0 +1,159 @@
+import os
+from contextlib import contextmanager
+import pygame
+from pygame._sdl2 import Renderer, Texture
+from pygame._sdl2.sdl2 import error as SDLError
+from utils.logger import get_logger
+
+logger = get_logger("RenderTarget")
+
+# SDL_BlendFactor / SDL_BlendOperation values
+_BLENDFACTOR_ONE = 0x2
+_BLENDFACTOR_ONE_MINUS_SRC_ALPHA = 0x6
+_BLENDOPERATION_ADD = 0x1
+
+# SDL reads hints from the environment when they were not set explicitly.
+# The filter of a texture is fixed when it is created.
+_SCALE_QUALITY_HINT = "SDL_RENDER_SCALE_QUALITY"
+
+# Blend mode for textures holding premultiplied alpha (1 = SDL_BLENDMODE_BLEND is for straight alpha).
+# Anything drawn with SDL_BLENDMODE_BLEND into a target cleared to (0, 0, 0, 0) ends up
+# premultiplied, so render targets must be drawn with this mode to avoid dark fringes.
+BLENDMODE_PREMULTIPLIED = Renderer.compose_custom_blend_mode(
+    (_BLENDFACTOR_ONE, _BLENDFACTOR_ONE_MINUS_SRC_ALPHA, _BLENDOPERATION_ADD),
+    (_BLENDFACTOR_ONE, _BLENDFACTOR_ONE_MINUS_SRC_ALPHA, _BLENDOPERATION_ADD),
+)
+_BLENDMODE_BLEND = 1
+
+# Renderers (by id) without custom blend modes, e.g. SDL's software renderer
+_no_custom_blend = set()
+
+
+def create_texture(renderer, size, linear=False, **kwargs):
+    """
+    Creates a texture, with linear filtering if 'linear' (SDL's default is nearest).
+    Extra arguments go to Texture (e.g. target=True).
+    """
+    size = (int(size[0]), int(size[1]))
+    if not linear:
+        return Texture(renderer, size, **kwargs)
+
+    previous = os.environ.get(_SCALE_QUALITY_HINT)
+    os.environ[_SCALE_QUALITY_HINT] = "linear"
+    try:
+        return Texture(renderer, size, **kwargs)
+    finally:
+        if previous is None:
+            del os.environ[_SCALE_QUALITY_HINT]
+        else:
+            os.environ[_SCALE_QUALITY_HINT] = previous
+
+
+def create_render_target(renderer, size, linear=False):
+    """
+    Creates a texture that can be rendered into, set up for premultiplied
+    blending. Renderers without custom blend modes (the software renderer)
+    get straight alpha blending instead: semi-transparent edges of the baked
+    content come out slightly darker, everything else is the same.
+    """
+    texture = create_texture(renderer, size, linear, target=True)
+    if id(renderer) not in _no_custom_blend:
+        try:
+            texture.blend_mode = BLENDMODE_PREMULTIPLIED
+            return texture
+        except (pygame.error, SDLError) as e:
+            _no_custom_blend.add(id(renderer))
+            logger.warn(f"Premultiplied blending not supported ({e}), render targets use alpha blending.")
+    texture.blend_mode = _BLENDMODE_BLEND
+    return texture
+
+
+@contextmanager
+def render_to(renderer, texture, clear_color=(0, 0, 0, 0)):
+    """
+    Redirects drawing into 'texture' (cleared first) for the duration of the block.
+    Restores the previous target, viewport and scale afterwards; SDL resets
+    those whenever the target changes.
+    """
+    previous_target = renderer.target
+    previous_viewport = renderer.get_viewport()
+    previous_scale = renderer.scale
+    previous_color = renderer.draw_color
+
+    renderer.target = texture
+    if clear_color is not None:
+        renderer.draw_color = clear_color
+        renderer.clear()
+    try:
+        yield texture
+    finally:
+        renderer.target = previous_target
+        renderer.scale = previous_scale
+        renderer.set_viewport(previous_viewport)
+        renderer.draw_color = previous_color
+
+
+class ScaledCanvas:
+    """
+    Renders frames at a fraction of the output size into an intermediate target
+    and upscales it (linear filtering) to the window with one opaque blit.
+
+    Drawing code keeps using output coordinates: the renderer scale maps them
+    onto the smaller target, so layout and hit-testing are unaffected. Cached
+    textures keep their full resolution, only the fill rate goes down.
+    """
+
+    MIN_SCALE = 0.25
+
+    def __init__(self, renderer, size, scale=1.0):
+        self.renderer = renderer
+        self.size = (int(size[0]), int(size[1]))
+        self.scale = 1.0
+        self.texture = None
+        self.set_scale(scale)
+
+    def set_scale(self, scale):
+        """Sets the render scale (clamped to MIN_SCALE - 1.0)."""
+        scale = max(self.MIN_SCALE, min(1.0, float(scale)))
+        if scale != self.scale:
+            self.scale = scale
+            self._create_target()
+
+    def resize(self, size):
+        """Sets the output size (e.g. after the window resolution changed)."""
+        size = (int(size[0]), int(size[1]))
+        if size != self.size:
+            self.size = size
+            self._create_target()
+
+    def _create_target(self):
+        # Imported here, the texture cache itself uses this module
+        from ui.texture_cache import get_texture_cache
+        cache = get_texture_cache(self.renderer)
+        key = ('scaled_canvas', id(self))
+
+        self.texture = None
+        cache.untrack(key)
+        if self.scale >= 1.0:
+            return
+
+        size = (max(1, round(self.size[0] * self.scale)), max(1, round(self.size[1] * self.scale)))
+        self.texture = create_texture(self.renderer, size, linear=True, target=True)
+        cache.track(key, size)
+        # Screens clear the whole frame, no need to blend the upscale
+        self.texture.blend_mode = 0 # SDL_BLENDMODE_NONE
+
+    @contextmanager
+    def frame(self):
+        """Redirects the drawing of one frame into the canvas, then upscales it."""
+        if self.texture is None:
+            yield
+            return
+
+        with render_to(self.renderer, self.texture, clear_color=None):
+            self.renderer.scale = (
+                self.texture.width / self.size[0],
+                self.texture.height / self.size[1],
+            )
+            yield
+        self.texture.draw(dstrect=(0, 0) + self.size)
@@ -0,0 +1,80 @@
+import pygame
+from ui.render_target import create_render_target, render_to
+from ui.texture_cache import get_texture_cache
+from utils.logger import get_logger
+
+logger = get_logger("StaticLayer")
+
+
+class StaticLayer:
+    """
+    Flattens a group of static drawables into one cached render target.
+
+    'items' are objects with a draw() method (images, buttons, selectors, ...)
+    that draw in screen coordinates. They are rendered once into a texture
+    covering 'bounds' and the layer is drawn with a single blit afterwards.
+    Call invalidate() whenever one of the items changes.
+
+    Opaque layers (e.g. full-screen backgrounds) are drawn without blending,
+    which saves fill rate; only use it when the items cover the bounds fully.
+    """
+
+    def __init__(self, renderer, items, bounds, opaque=False):
+        self.renderer = renderer
+        self.items = list(items)
+        self.bounds = pygame.Rect(bounds)
+        self.opaque = opaque
+
+        self.texture = None
+        self.dirty = True
+
+    @staticmethod
+    def union_bounds(rects):
+        """Smallest rect containing all given rects."""
+        rects = [pygame.Rect(r) for r in rects]
+        return rects[0].unionall(rects[1:]) if rects else pygame.Rect(0, 0, 0, 0)
+
+    def invalidate(self):
+        """Marks the layer for re-rendering on the next draw."""
+        self.dirty = True
+
+    def bake(self):
+        """Renders all items into the layer texture."""
+        if self.bounds.width <= 0 or self.bounds.height <= 0:
+            return
+
+        if self.texture is None:
+            self.texture = create_render_target(self.renderer, self.bounds.size)
+            get_texture_cache(self.renderer).track(('static_layer', id(self)), self.bounds.size)
+            if self.opaque:
+                self.texture.blend_mode = 0 # SDL_BLENDMODE_NONE
+
+        with render_to(self.renderer, self.texture):
+            # Shift the viewport so items can keep drawing in screen coordinates
+            self.renderer.set_viewport(pygame.Rect(
+                -self.bounds.x, -self.bounds.y,
+                self.bounds.right, self.bounds.bottom
+            ))
+            for item in self.items:
+                item.draw()
+
+        self.dirty = False
+
+    def draw(self):
+        if self.dirty:
+            try:
+                self.bake()
+            except Exception as e:
+                # Render the items directly rather than showing nothing
+                logger.warn(f"Could not bake static layer ({e}), drawing items directly.")
+                for item in self.items:
+                    item.draw()
+                return
+
+        if self.texture:
+            self.texture.draw(dstrect=self.bounds)
+
+    def cleanup(self):
+        """Releases the layer texture (the items are owned by the screen)."""
+        self.texture = None
+        get_texture_cache(self.renderer).untrack(('static_layer', id(self)))
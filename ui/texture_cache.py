@@ -0,0 +1,326 @@
+import os
+import time
+import itertools
+import pygame
+from PIL import Image, ImageOps
+from pygame._sdl2 import Texture
+from config import ASSET_CACHE_FOLDER
+from ui.render_target import create_render_target
+from utils.asset_pack import AssetPack
+from utils.image_utils import ImageUtils
+from utils.logger import get_logger
+from utils.photo_writer import get_photo_writer
+
+logger = get_logger("TextureCache")
+
+
+class CachedTexture:
+    """
+    A GPU texture shared by every user of the same key.
+    'texture' is None while the entry is evicted (see TextureCache.restore()).
+    """
+
+    def __init__(self, key, surface, texture, size=None):
+        self.key = key
+        self.surface = surface
+        self.texture = texture
+        self.size = size or surface.get_size()
+        self.refcount = 0
+        self.last_drawn = 0 # TextureCache.frame of the last draw
+
+    @property
+    def bytes(self):
+        """GPU memory held by the texture (RGBA)."""
+        return self.size[0] * self.size[1] * 4 if self.texture is not None else 0
+
+    @property
+    def evictable(self):
+        """
+        Images are rebuilt from disk; baked textures can only be redrawn by
+        their owner and in-memory images have no copy left to rebuild from.
+        """
+        return self.key[0] not in ('baked', 'memory')
+
+
+class TextureCache:
+    """
+    Hands out shared textures keyed by (path, target size, transform).
+
+    Every acquire() must be paired with a release(). An entry (and its texture)
+    is dropped as soon as its last user releases it. Preloaded entries (see
+    insert()) stay unreferenced until acquired or removed by trim().
+
+    Supported transforms:
+        None          - the image as stored on disk (size must be None)
+        'smoothscale' - pygame.transform.smoothscale to size
+        'scale'       - pygame.transform.scale to size
+        'cover'       - ImageUtils.resize_and_crop_to_fit to size
+
+    Decoded and transformed assets are also kept in an on-disk AssetPack, so a
+    cold start (or a resolution switch) maps raw pixels instead of decoding PNGs.
+
+    Images that only exist in memory (e.g. a captured frame) are uploaded with
+    acquire_memory() and keyed by a name instead of a path.
+
+    Memory: CPU surfaces are dropped once uploaded. When the textures exceed
+    'budget' bytes, end_frame() evicts the least recently drawn image textures;
+    their users get them back from restore() (via the asset pack) on next use.
+    Textures created outside the cache (render targets, atlases, ...) are
+    accounted with track()/untrack() so report() shows the full picture.
+    """
+
+    TRANSFORMS = (None, 'smoothscale', 'scale', 'cover')
+    REPORT_INTERVAL = 60.0 # Seconds between memory reports
+
+    def __init__(self, renderer, asset_pack=None, budget=None):
+        self.renderer = renderer
+        self.asset_pack = asset_pack
+        self.entries = {}
+        self.budget = budget # Bytes, None for unlimited
+        self.external = {} # key -> bytes of textures owned elsewhere
+        self.frame = 0
+        self.evictions = 0
+        self.restores = 0
+        self._over_budget_warned = False
+        self._last_report = time.perf_counter()
+        self._memory_names = itertools.count()
+
+    @staticmethod
+    def make_key(path, size=None, transform=None):
+        """Normalizes the arguments into a cache key."""
+        if transform not in TextureCache.TRANSFORMS:
+            raise ValueError(f"Unknown transform '{transform}'.")
+        if (size is None) != (transform is None):
+            raise ValueError("size and transform must be given together.")
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        return (os.path.normpath(path), size, transform)
+
+    def acquire(self, path, size=None, transform=None):
+        """
+        Returns the shared CachedTexture for the key, loading it if needed.
+        Raises pygame.error if the image cannot be loaded.
+        """
+        key = self.make_key(path, size, transform)
+        entry = self.entries.get(key)
+        if entry is None:
+            surface = self._build_surface(key)
+            entry = self._upload(key, surface)
+        elif entry.texture is None:
+            self.restore(entry)
+        entry.refcount += 1
+        return entry
+
+    def acquire_memory(self, source, size=None, transform=None, name=None):
+        """
+        Returns a shared CachedTexture for an in-memory image (see
+        ImageUtils.to_surface() for the accepted sources). Images with the same
+        'name', size and transform share a texture; without a name the image
+        gets its own. Raises ValueError/TypeError for unusable sources.
+        """
+        if name is None:
+            name = f"#{next(self._memory_names)}"
+        key = ('memory',) + self.make_key(name, size, transform)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self._upload(key, self._memory_surface(source, size, transform))
+        entry.refcount += 1
+        return entry
+
+    @classmethod
+    def _memory_surface(cls, source, size, transform):
+        if transform == 'cover' and isinstance(source, Image.Image):
+            # Crop before converting, only the kept pixels are copied into the surface
+            return ImageUtils.to_surface(ImageOps.fit(source, size, Image.BILINEAR))
+        surface = ImageUtils.to_surface(source)
+        if transform is None:
+            return surface
+        return cls.transform_surface(surface, size, transform)
+
+    def acquire_baked(self, key, size, bake, linear=False):
+        """
+        Returns a shared render-target texture identified by 'key' (a tuple
+        starting with 'baked'), calling bake(texture) to draw it on first use.
+        The texture holds premultiplied alpha ('linear' enables linear filtering).
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            texture = create_render_target(self.renderer, size, linear)
+            bake(texture)
+            entry = CachedTexture(key, None, texture, (int(size[0]), int(size[1])))
+            self.entries[key] = entry
+        entry.refcount += 1
+        return entry
+
+    def build_surface(self, path, size=None, transform=None):
+        """
+        Decodes (or maps from the asset pack) the surface for a key without
+        touching the GPU. Safe to call from worker threads.
+        """
+        return self._build_surface(self.make_key(path, size, transform))
+
+    def insert(self, path, size, transform, surface):
+        """
+        Uploads a surface built by build_surface() as an unreferenced entry.
+        Must be called on the render thread.
+        """
+        key = self.make_key(path, size, transform)
+        if key not in self.entries:
+            self._upload(key, surface)
+
+    def trim(self):
+        """Drops all entries nobody holds (e.g. preloaded but never used)."""
+        unused = [key for key, entry in self.entries.items() if entry.refcount <= 0]
+        for key in unused:
+            self._drop(self.entries.pop(key))
+        return len(unused)
+
+    def restore(self, entry):
+        """Re-uploads an evicted entry. Returns False if its image can't be loaded anymore."""
+        if entry.texture is not None:
+            return True
+        try:
+            entry.texture = self._create_texture(self._build_surface(entry.key))
+        except (pygame.error, FileNotFoundError) as e:
+            logger.error(f"Could not restore evicted texture {entry.key[0]}: {e}")
+            return False
+        self.restores += 1
+        return True
+
+    def track(self, key, size):
+        """Accounts a texture created outside the cache (e.g. a render target)."""
+        self.external[key] = int(size[0]) * int(size[1]) * 4
+
+    def untrack(self, key):
+        self.external.pop(key, None)
+
+    def end_frame(self):
+        """Called once per presented frame: enforces the budget, reports periodically."""
+        self.frame += 1
+        if self.budget is not None:
+            self.enforce_budget()
+        if time.perf_counter() - self._last_report >= self.REPORT_INTERVAL:
+            self.report()
+
+    def enforce_budget(self):
+        """Evicts least recently drawn textures until the total fits the budget."""
+        total = self.total_bytes()
+        if total <= self.budget:
+            self._over_budget_warned = False
+            return
+
+        # Unused entries go first (and entirely), then the ones not drawn for longest.
+        # Textures drawn in the last two frames are on screen and kept.
+        candidates = sorted(
+            (e for e in self.entries.values()
+             if e.texture is not None and e.evictable and e.last_drawn < self.frame - 1),
+            key=lambda e: (e.refcount > 0, e.last_drawn)
+        )
+        for entry in candidates:
+            if total <= self.budget:
+                break
+            total -= entry.bytes
+            self.evictions += 1
+            if entry.refcount <= 0:
+                del self.entries[entry.key]
+                self._drop(entry)
+            else:
+                entry.texture = None
+
+        if total > self.budget and not self._over_budget_warned:
+            logger.warn(f"Textures in use need {total / 2**20:.1f} MB, over the {self.budget / 2**20:.0f} MB budget.")
+            self._over_budget_warned = True
+
+    def release(self, entry):
+        """Drops one reference to the entry and frees it when unused."""
+        if entry is None:
+            return
+        entry.refcount -= 1
+        if entry.refcount <= 0 and self.entries.get(entry.key) is entry:
+            del self.entries[entry.key]
+            self._drop(entry)
+
+    @staticmethod
+    def _drop(entry):
+        entry.texture = None
+        entry.surface = None
+
+    def _create_texture(self, surface):
+        texture = Texture.from_surface(self.renderer, surface)
+        # Enable alpha blending (1 = SDL_BLENDMODE_BLEND)
+        texture.blend_mode = 1
+        return texture
+
+    def _upload(self, key, surface):
+        # The CPU copy isn't kept: restore() rebuilds it from the asset pack if needed
+        entry = CachedTexture(key, None, self._create_texture(surface), surface.get_size())
+        self.entries[key] = entry
+        return entry
+
+    def _build_surface(self, key):
+        path, size, transform = key
+        use_pack = self.asset_pack is not None and self.asset_pack.accepts(path)
+        if use_pack:
+            surface = self.asset_pack.load(path, size, transform)
+            if surface is not None:
+                return surface
+
+        surface = self._decode_surface(key)
+        if use_pack:
+            self.asset_pack.store(path, size, transform, surface)
+        return surface
+
+    def _decode_surface(self, key):
+        path, size, transform = key
+        # Through the photo writer: captures may still be staged in RAM
+        with get_photo_writer().open_photo(path) as f:
+            surface = pygame.image.load(f, path)
+        if transform is None:
+            return surface
+        return self.transform_surface(surface, size, transform)
+
+    @staticmethod
+    def transform_surface(surface, size, transform):
+        """Applies one of the supported transforms to a surface."""
+        if transform == 'smoothscale':
+            return pygame.transform.smoothscale(surface, size)
+        if transform == 'scale':
+            return pygame.transform.scale(surface, size)
+        if transform == 'cover':
+            return ImageUtils.resize_and_crop_to_fit(surface, new_width=size[0], new_height=size[1])
+        return surface
+
+    def total_bytes(self):
+        """GPU memory of all cached and tracked textures."""
+        return sum(e.bytes for e in self.entries.values()) + sum(self.external.values())
+
+    def stats(self):
+        """Returns (number of entries, total references, total texture bytes)."""
+        refs = sum(e.refcount for e in self.entries.values())
+        return len(self.entries), refs, self.total_bytes()
+
+    def report(self):
+        """Logs the texture memory totals."""
+        self._last_report = time.perf_counter()
+        images = sum(e.bytes for e in self.entries.values() if e.evictable)
+        baked = sum(e.bytes for e in self.entries.values() if not e.evictable)
+        external = sum(self.external.values())
+        evicted = sum(1 for e in self.entries.values() if e.texture is None)
+        budget = f"{self.budget / 2**20:.0f} MB" if self.budget is not None else "unlimited"
+        logger.info(
+            f"Texture memory: {(images + baked + external) / 2**20:.1f} MB of {budget} "
+            f"(images {images / 2**20:.1f}, baked {baked / 2**20:.1f}, other {external / 2**20:.1f}); "
+            f"{len(self.entries)} entries, {evicted} evicted, {self.evictions} evictions, {self.restores} restores"
+        )
+
+
+# Global factory (one cache per renderer)
+_caches = {}
+
+def get_texture_cache(renderer):
+    key = id(renderer)
+    cache = _caches.get(key)
+    if cache is None or cache.renderer is not renderer:
+        cache = TextureCache(renderer, AssetPack(ASSET_CACHE_FOLDER))
+        _caches[key] = cache
+    return cache
@@ -0,0 +1,89 @@
+import os
+import mmap
+import struct
+import hashlib
+import pygame
+from utils.logger import get_logger
+
+logger = get_logger("AssetPack")
+
+HEADER = struct.Struct("<4sII") # magic, width, height
+MAGIC = b"PBAP"
+
+
+class AssetPack:
+    """
+    On-disk cache of decoded (and pre-scaled) assets stored as raw RGBA buffers.
+
+    Entries are keyed by asset path, size and transform; the file name also
+    carries the source mtime, so editing an asset invalidates its entries.
+    Files are memory-mapped on load and handed to pygame without copying.
+    """
+
+    def __init__(self, cache_dir, asset_roots=("assets",)):
+        self.cache_dir = cache_dir
+        self.asset_roots = [os.path.normpath(root) for root in asset_roots]
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def accepts(self, path):
+        """Only static assets are packed (not captured photos)."""
+        path = os.path.normpath(path)
+        return any(path == root or path.startswith(root + os.sep) for root in self.asset_roots)
+
+    def _entry_prefix(self, path, size, transform):
+        ident = f"{os.path.abspath(path)}|{size}|{transform}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:20]
+
+    def _entry_path(self, path, size, transform):
+        mtime_ns = os.stat(path).st_mtime_ns
+        prefix = self._entry_prefix(path, size, transform)
+        return os.path.join(self.cache_dir, f"{prefix}-{mtime_ns}.rgba")
+
+    def load(self, path, size=None, transform=None):
+        """Returns the packed surface, or None if there is no valid entry."""
+        try:
+            entry_path = self._entry_path(path, size, transform)
+            if not os.path.exists(entry_path):
+                return None
+
+            with open(entry_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            magic, width, height = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or len(mapped) != HEADER.size + width * height * 4:
+                logger.warn(f"Corrupt asset pack entry '{entry_path}', ignoring.")
+                return None
+
+            # The surface keeps the mapping alive through the buffer reference
+            return pygame.image.frombuffer(memoryview(mapped)[HEADER.size:], (width, height), "RGBA")
+        except (OSError, ValueError, struct.error) as e:
+            logger.warn(f"Failed to read asset pack entry for '{path}': {e}")
+            return None
+
+    def store(self, path, size, transform, surface):
+        """Writes the surface as a raw RGBA entry (atomically) and drops stale versions."""
+        try:
+            entry_path = self._entry_path(path, size, transform)
+            width, height = surface.get_size()
+            tmp_path = entry_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, width, height))
+                f.write(pygame.image.tobytes(surface, "RGBA"))
+            os.replace(tmp_path, entry_path)
+
+            # Remove entries for older versions of the same asset
+            prefix = self._entry_prefix(path, size, transform)
+            current = os.path.basename(entry_path)
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix + "-") and name != current:
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError as e:
+            logger.warn(f"Failed to write asset pack entry for '{path}': {e}")
+
+    def clear(self):
+        """Removes all entries."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".rgba") or name.endswith(".tmp"):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,175 @@
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+import pygame
+from config import FPS
+from utils.logger import get_logger
+
+logger = get_logger("FrameScheduler")
+
+
+class FrameScheduler:
+    """
+    Paces the main loop to the display refresh and checks every frame against
+    its deadline (one refresh interval).
+
+    A frame is split into phases (event, update, draw, present) timed with
+    phase(). A frame that takes longer than 'miss_factor' budgets missed at
+    least one vblank: it is logged with the screen and the slowest phase, and
+    counted per (screen, phase) so the periodic report shows what stutters.
+
+    With vsync the renderer's present() already blocks until the next vblank,
+    so the scheduler only sleeps when present() evidently didn't (vsync not
+    available, e.g. some drivers or minimized windows) or when the frame rate
+    is capped below the refresh rate (set_frame_rate()).
+    """
+
+    PHASES = ("event", "update", "draw", "present")
+
+    def __init__(self, refresh_rate=60, vsync=True, miss_factor=1.5, report_interval=30.0, history=600):
+        self.refresh_rate = refresh_rate
+        self.refresh_interval = 1.0 / refresh_rate
+        self.budget = self.refresh_interval
+        self.vsync = vsync
+        self.miss_factor = miss_factor
+        self.report_interval = report_interval
+
+        # Presented frames only, from begin_frame() to end_frame() (seconds)
+        self.frame_times = deque(maxlen=history)
+        self.phase_times = dict.fromkeys(self.PHASES, 0.0)
+        self.screen = None # Screen that ran the current frame
+        self.last_missed = False # Whether the last presented frame missed its deadline
+        self.last_busy = 0.0 # Time the last frame spent outside present() (seconds)
+
+        self.frames = 0
+        self.missed = 0
+        self.missed_by_cause = Counter() # (screen, phase) -> missed frames
+
+        self._frame_start = None
+        self._last_report = time.perf_counter()
+
+    @staticmethod
+    def detect_refresh_rate(default=60):
+        """Refresh rate of the (first) display, or 'default' if SDL doesn't know it."""
+        try:
+            rates = [rate for rate in pygame.display.get_desktop_refresh_rates() if rate > 0]
+        except (pygame.error, AttributeError):
+            rates = []
+        return rates[0] if rates else default
+
+    def set_frame_rate(self, frame_rate):
+        """Caps the frame rate (at most the refresh rate); the budget follows it."""
+        frame_rate = min(self.refresh_rate, max(1, frame_rate))
+        self.budget = 1.0 / frame_rate
+
+    def headroom(self):
+        """
+        Seconds the last presented frame left of its budget (negative if it
+        ran over): roughly how much deferrable work (e.g. a texture bake) the
+        current frame can take on without missing its deadline.
+        """
+        return self.budget - self.last_busy
+
+    def begin_frame(self):
+        """Starts a frame. Returns the time since the previous frame start (seconds)."""
+        now = time.perf_counter()
+        dt = 0.0 if self._frame_start is None else now - self._frame_start
+        self._frame_start = now
+        for phase in self.phase_times:
+            self.phase_times[phase] = 0.0
+        return dt
+
+    @contextmanager
+    def phase(self, name, screen=None):
+        """Times a phase of the current frame ('screen' is the screen running it)."""
+        if screen is not None:
+            self.screen = screen
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] += time.perf_counter() - start
+
+    def end_frame(self, presented=True):
+        """
+        Checks the frame against its deadline and paces the loop.
+        Frames that were skipped (nothing presented) are not counted.
+        """
+        if self._frame_start is None:
+            return
+
+        elapsed = time.perf_counter() - self._frame_start
+        if presented:
+            self._record(elapsed)
+
+            # Sleep the rest of the budget. If present() waited for vblank, the
+            # next present() waits for one too, so leave one refresh interval.
+            pace_to = self.budget
+            if self.vsync and elapsed >= self.refresh_interval * 0.5:
+                pace_to -= self.refresh_interval
+            remaining = pace_to - elapsed
+            if remaining > 0.001:
+                time.sleep(remaining)
+
+        if time.perf_counter() - self._last_report >= self.report_interval:
+            self.report()
+
+    def _record(self, elapsed):
+        self.frames += 1
+        self.frame_times.append(elapsed)
+        self.last_busy = elapsed - self.phase_times["present"]
+        self.last_missed = elapsed > self.budget * self.miss_factor
+
+        if not self.last_missed:
+            return
+
+        self.missed += 1
+        # Time outside the timed phases (e.g. loop overhead, GC pauses)
+        times = dict(self.phase_times, other=max(0.0, elapsed - sum(self.phase_times.values())))
+        phase = max(times, key=times.get)
+        self.missed_by_cause[(self.screen, phase)] += 1
+        phases = ", ".join(f"{name} {t * 1000:.1f}" for name, t in times.items())
+        logger.warn(
+            f"Missed frame deadline on '{self.screen}': {elapsed * 1000:.1f} ms "
+            f"(budget {self.budget * 1000:.1f} ms), slowest phase '{phase}' [{phases} ms]"
+        )
+
+    def percentile(self, fraction):
+        """Frame time (seconds) below which 'fraction' of the recent frames fall."""
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self):
+        """Returns (frames, missed, p50, p95, p99) with frame times in seconds."""
+        return (
+            self.frames, self.missed,
+            self.percentile(0.5), self.percentile(0.95), self.percentile(0.99),
+        )
+
+    def report(self):
+        """Logs the frame time distribution and the main causes of missed deadlines."""
+        self._last_report = time.perf_counter()
+        if not self.frames:
+            return
+
+        frames, missed, p50, p95, p99 = self.stats()
+        causes = ", ".join(
+            f"{screen}/{phase}: {count}" for (screen, phase), count in self.missed_by_cause.most_common(3)
+        )
+        logger.info(
+            f"Frames: {frames}, missed: {missed} ({missed / frames:.1%}), "
+            f"p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms"
+            + (f", missed by {causes}" if causes else "")
+        )
+
+
+# Global factory
+_scheduler = None
+
+def get_frame_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FrameScheduler(FrameScheduler.detect_refresh_rate(default=FPS), vsync=True)
+    return _scheduler
@@ -1,6 +1,40 @@
+import io
 import pygame
+from PIL import Image
 
 class ImageUtils:
+    @staticmethod
+    def to_surface(source):
+        """
+        Converts an in-memory image to a pygame.Surface without touching the disk.
+
+        Args:
+            source: a pygame.Surface, a PIL image, a uint8 numpy array
+                    (height x width, height x width x 3 or x 4) or the bytes
+                    of an encoded image file (JPEG, PNG, ...)
+
+        Returns:
+            pygame.Surface (the source itself if it already is one)
+        """
+        if isinstance(source, pygame.Surface):
+            return source
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return pygame.image.load(io.BytesIO(source))
+
+        if hasattr(source, '__array_interface__') and not isinstance(source, Image.Image):
+            # numpy array in (height, width[, channels]) layout
+            if source.dtype.itemsize != 1 or source.ndim not in (2, 3):
+                raise ValueError(f"Unsupported array {source.shape} {source.dtype}, expected uint8 pixels.")
+            source = Image.fromarray(source)
+
+        if isinstance(source, Image.Image):
+            if source.mode not in ('RGB', 'RGBA'):
+                source = source.convert('RGBA' if 'A' in source.getbands() else 'RGB')
+            return pygame.image.frombytes(source.tobytes(), source.size, source.mode)
+
+        raise TypeError(f"Unsupported image source {type(source).__name__}.")
+
     @staticmethod
     def fit_image_to_square(image, size, background=(255, 255, 255, 255)):
         """
@@ -0,0 +1,281 @@
+import os
+import shutil
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger("PhotoStorage")
+
+
+def open_located(located, path):
+    """
+    Opens a photo for reading at 'located' (what locate() returned), or at
+    its final 'path' if the staged copy was flushed in between. A flush
+    renames the photo into place before it removes the staged copy, so one
+    of the two always exists, and an open file stays readable after its
+    staged copy is removed. Also usable in worker processes.
+    """
+    try:
+        return open(located, "rb")
+    except FileNotFoundError:
+        if located == path:
+            raise
+        return open(path, "rb")
+
+
+class PhotoStorage:
+    """
+    Write-behind storage: photos are first written to a RAM-backed staging
+    directory (tmpfs, e.g. /dev/shm) and later moved to the durable target
+    (SD card or USB drive) in sequential batches, so capture never waits on the
+    card's write latency spikes.
+
+    Batches are flushed once no photo was staged for 'idle_delay' seconds
+    (between sessions), or straight away when staging passes 'high_watermark'
+    of its size. When staging is full, reserve() waits for the flush
+    (backpressure) and falls back to writing to the target directly.
+
+    Staged photos survive an application crash (tmpfs lives until reboot) and
+    are flushed on the next start; a power loss loses whatever was not
+    flushed yet, trading instant durability for throughput.
+    """
+
+    TEMP_SUFFIX = ".part"
+    BACKPRESSURE_TIMEOUT = 10.0 # Seconds to wait for staging space before bypassing it
+
+    def __init__(self, target_dir, staging_dir, max_staging_bytes=512 * 2**20, idle_delay=15.0, high_watermark=0.75):
+        self.target_dir = os.path.normpath(target_dir)
+        self.staging_dir = os.path.normpath(staging_dir)
+        self.max_staging_bytes = max_staging_bytes
+        self.idle_delay = idle_delay
+        self.high_watermark = high_watermark
+
+        self.staged = {} # target path -> staged path
+        self.staged_bytes = 0
+        self.reserved = 0 # Writes in progress into staging
+        self.flushed = 0
+        self.batches = 0
+
+        self._last_staged = 0.0
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        """Recovers photos left in staging by a previous run and starts flushing."""
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._recover()
+        self._thread = threading.Thread(target=self._run, name="PhotoStorageFlush", daemon=True)
+        self._thread.start()
+
+    def _staging_path(self, path):
+        rel = os.path.relpath(os.path.normpath(path), self.target_dir)
+        if rel.startswith(os.pardir):
+            return None # Outside the target directory, not staged
+        return os.path.join(self.staging_dir, rel)
+
+    def _target_path(self, staging_path):
+        return os.path.join(self.target_dir, os.path.relpath(staging_path, self.staging_dir))
+
+    def _recover(self):
+        recovered = 0
+        for root, _, files in os.walk(self.staging_dir):
+            for name in files:
+                staging_path = os.path.join(root, name)
+                if name.endswith(self.TEMP_SUFFIX):
+                    # Interrupted write, the photo was never reported as saved
+                    os.remove(staging_path)
+                    continue
+                target_path = self._target_path(staging_path)
+                self.staged[target_path] = staging_path
+                self.staged_bytes += os.path.getsize(staging_path)
+                recovered += 1
+        if recovered:
+            logger.warn(f"Recovered {recovered} unflushed photos from '{self.staging_dir}'.")
+
+    def reserve(self, path):
+        """
+        Returns where a photo for 'path' should be written: in staging, or
+        'path' itself if staging is full for too long. Pair with commit().
+        """
+        staging_path = self._staging_path(path)
+        if staging_path is None:
+            return path
+
+        with self._cond:
+            deadline = time.monotonic() + self.BACKPRESSURE_TIMEOUT
+            while self.staged_bytes >= self.max_staging_bytes and not self._closing:
+                self._cond.notify_all() # Wake the flusher
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warn("Photo staging still full, writing directly to the target.")
+                    return path
+                self._cond.wait(remaining)
+            if self._closing:
+                return path
+            self.reserved += 1
+        return staging_path
+
+    def commit(self, path, written_path):
+        """Registers a photo written to the location reserve() returned."""
+        if written_path == path:
+            return
+        size = os.path.getsize(written_path)
+        with self._cond:
+            self.reserved -= 1
+            self.staged[os.path.normpath(path)] = written_path
+            self.staged_bytes += size
+            self._last_staged = time.monotonic()
+            self._cond.notify_all()
+
+    def abort(self, path, written_path):
+        """Releases a reservation whose write failed."""
+        if written_path == path:
+            return
+        with self._cond:
+            self.reserved -= 1
+            self._cond.notify_all()
+
+    def locate(self, path):
+        """
+        Current location of a photo: its staged copy until it was flushed.
+        The staged copy can disappear right after; read photos with open().
+        """
+        with self._cond:
+            return self.staged.get(os.path.normpath(path), path)
+
+    def open(self, path):
+        """Opens a photo for reading, wherever it is (see open_located())."""
+        return open_located(self.locate(path), path)
+
+    def exists(self, path):
+        """Whether a photo was saved, staged or flushed."""
+        return os.path.exists(self.locate(path)) or os.path.exists(path)
+
+    @property
+    def pending(self):
+        """Staged photos not yet on the target."""
+        with self._cond:
+            return len(self.staged)
+
+    def _should_flush(self):
+        if not self.staged:
+            return False
+        if self._closing or self.staged_bytes >= self.max_staging_bytes * self.high_watermark:
+            return True
+        return self.reserved == 0 and time.monotonic() - self._last_staged >= self.idle_delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._should_flush():
+                    if self._closing:
+                        return
+                    self._cond.wait(1.0)
+                batch = dict(self.staged)
+            if not self._flush_batch(batch) and self._closing:
+                return # The target is unusable, the photos stay staged
+
+    def _flush_batch(self, batch):
+        """
+        Moves a batch to the target: copy all, sync, then rename and drop the
+        staged copies. Returns the number of photos moved.
+        """
+        start = time.perf_counter()
+        copied = []
+        for target_path, staging_path in sorted(batch.items()):
+            temp_path = target_path + self.TEMP_SUFFIX
+            try:
+                os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+                shutil.copyfile(staging_path, temp_path)
+                with open(temp_path, "rb+") as f:
+                    os.fsync(f.fileno())
+                copied.append((target_path, staging_path, temp_path))
+            except OSError as e:
+                # Stays staged, retried with the next batch
+                logger.error(f"Failed to flush '{target_path}': {e}")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+        directories = set()
+        total = 0
+        moved = 0
+        for target_path, staging_path, temp_path in copied:
+            try:
+                os.replace(temp_path, target_path)
+            except OSError as e:
+                logger.error(f"Failed to flush '{target_path}': {e}")
+                continue
+            moved += 1
+            directories.add(os.path.dirname(target_path) or ".")
+            size = os.path.getsize(staging_path)
+            with self._cond:
+                del self.staged[target_path]
+                self.staged_bytes -= size
+                self._cond.notify_all()
+            os.remove(staging_path)
+            total += size
+
+        for directory in directories:
+            try:
+                dir_fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            except OSError:
+                pass
+
+        if moved:
+            self.flushed += moved
+            self.batches += 1
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Flushed {moved} photos ({total / 2**20:.1f} MB) to '{self.target_dir}' "
+                f"in {elapsed:.2f}s ({total / 2**20 / max(elapsed, 1e-6):.1f} MB/s)"
+            )
+        elif batch and not self._closing:
+            # Nothing could be written (target missing or full), don't spin
+            time.sleep(5.0)
+        return moved
+
+    def close(self):
+        """Flushes everything that is staged and stops the flush thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self.staged:
+            logger.error(f"{len(self.staged)} photos remain in '{self.staging_dir}', they are flushed on the next start.")
+
+
+def create_photo_storage(settings, target_dir="photos"):
+    """
+    Creates and starts the write-behind storage configured in the settings,
+    or returns None if staging is disabled or its directory can't be used.
+    """
+    if not settings.get("photo_staging", True):
+        return None
+
+    staging_dir = settings.get("photo_staging_dir", "/dev/shm/photobooth")
+    if not os.path.isdir(os.path.dirname(os.path.normpath(staging_dir))):
+        logger.info(f"No RAM staging available at '{staging_dir}', photos are written directly.")
+        return None
+
+    storage = PhotoStorage(
+        target_dir,
+        staging_dir,
+        max_staging_bytes=int(settings.get("photo_staging_mb", 512)) * 2**20,
+        idle_delay=float(settings.get("photo_flush_idle_s", 15.0)),
+    )
+    try:
+        storage.start()
+    except OSError as e:
+        logger.error(f"Failed to set up photo staging in '{staging_dir}': {e}")
+        return None
+    logger.info(f"Staging photos in '{staging_dir}' (up to {storage.max_staging_bytes // 2**20} MB).")
+    return storage
@@ -0,0 +1,264 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import datetime
+from utils.logger import get_logger
+
+logger = get_logger("PhotoStore")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    status TEXT NOT NULL DEFAULT 'active' -- active, complete, aborted
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started_at);
+
+CREATE TABLE IF NOT EXISTS photos (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions (id),
+    shot INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    captured_at REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    saved_at REAL, -- NULL until the file is written
+    capture_ms REAL, -- Camera capture time
+    save_ms REAL -- Encode and write time
+);
+CREATE INDEX IF NOT EXISTS photos_session ON photos (session_id, shot);
+CREATE INDEX IF NOT EXISTS photos_captured ON photos (captured_at);
+
+CREATE TABLE IF NOT EXISTS renditions (
+    photo_id TEXT NOT NULL REFERENCES photos (id),
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (photo_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS files (
+    session_id TEXT NOT NULL REFERENCES sessions (id),
+    kind TEXT NOT NULL, -- e.g. the strip layout
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    render_ms REAL,
+    PRIMARY KEY (session_id, kind)
+);
+"""
+
+
+class PhotoStore:
+    """
+    Names and indexes captured photos.
+
+    Every session gets its own directory (<root>/<session id>/) and IDs that
+    can't collide: the session ID is the start time plus a random suffix, the
+    photo ID is the session ID plus the shot number. An SQLite index (WAL mode)
+    records sessions, shots, renditions, session outputs (e.g. photo strips) and
+    timings, so galleries and exports
+    query it instead of listing and parsing directories.
+
+    IDs and paths are generated in memory; the index is written by a
+    background thread, so the render thread never waits on the SD card.
+    Queries run on the calling thread (one connection per thread).
+    """
+
+    def __init__(self, root="photos", db_name="photos.sqlite3"):
+        self.root = root
+        self.db_path = os.path.join(root, db_name)
+        os.makedirs(root, exist_ok=True)
+
+        self._local = threading.local()
+        self._shots = {} # session id -> shots taken so far
+        self._lock = threading.Lock()
+
+        self._connection().executescript(SCHEMA)
+
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writes, name="PhotoStore", daemon=True)
+        self._writer.start()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _run_writes(self):
+        conn = self._connection()
+        while True:
+            item = self._writes.get()
+            if item is None:
+                self._writes.task_done()
+                return
+            # Commit everything queued so far in one transaction
+            batch = [item]
+            while True:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._writes.put(None) # Stop after this batch
+                    self._writes.task_done()
+                    break
+                batch.append(item)
+            try:
+                with conn:
+                    for sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to update the photo index: {e}")
+            for _ in batch:
+                self._writes.task_done()
+
+    def _write(self, sql, params=()):
+        self._writes.put((sql, params))
+
+    def flush(self):
+        """Blocks until all queued index updates are committed."""
+        self._writes.join()
+
+    def close(self):
+        """Commits the queued updates and stops the writer thread."""
+        self._writes.put(None)
+        self._writer.join()
+
+    # --- Recording ---
+
+    def begin_session(self):
+        """Starts a session. Returns its ID."""
+        now = time.time()
+        stamp = datetime.datetime.fromtimestamp(now).strftime("%Y%m%d_%H%M%S")
+        session_id = f"{stamp}_{uuid.uuid4().hex[:6]}"
+        with self._lock:
+            self._shots[session_id] = 0
+        self._write(
+            "INSERT INTO sessions (id, directory, started_at) VALUES (?, ?, ?)",
+            (session_id, self.session_dir(session_id), now),
+        )
+        logger.info(f"Session {session_id} started.")
+        return session_id
+
+    def end_session(self, session_id, status="complete"):
+        """Marks a session as finished ('complete' or 'aborted')."""
+        if session_id is None:
+            return
+        with self._lock:
+            self._shots.pop(session_id, None)
+        self._write(
+            "UPDATE sessions SET ended_at = ?, status = ? WHERE id = ?",
+            (time.time(), status, session_id),
+        )
+
+    def session_dir(self, session_id):
+        return os.path.join(self.root, session_id)
+
+    def new_photo(self, session_id, capture_ms=None):
+        """
+        Registers the next shot of a session. Returns (photo ID, path) for the
+        caller to save it to; report the write with photo_saved().
+        """
+        with self._lock:
+            shot = self._shots.get(session_id, 0) + 1
+            self._shots[session_id] = shot
+        photo_id = f"{session_id}-{shot}"
+        path = os.path.join(self.session_dir(session_id), f"{photo_id}.jpg")
+        self._write(
+            "INSERT INTO photos (id, session_id, shot, path, captured_at, capture_ms) VALUES (?, ?, ?, ?, ?, ?)",
+            (photo_id, session_id, shot, path, time.time(), capture_ms),
+        )
+        return photo_id, path
+
+    def photo_saved(self, photo_id, size=None, save_ms=None):
+        """Records that a photo's file was written ('size' is (width, height))."""
+        width, height = size if size else (None, None)
+        self._write(
+            "UPDATE photos SET saved_at = ?, width = ?, height = ?, save_ms = ? WHERE id = ?",
+            (time.time(), width, height, save_ms, photo_id),
+        )
+
+    def add_renditions(self, photo_id, renditions):
+        """Records {rendition name: path} for a photo."""
+        for name, path in renditions.items():
+            self._write(
+                "INSERT OR REPLACE INTO renditions (photo_id, name, path) VALUES (?, ?, ?)",
+                (photo_id, name, path),
+            )
+
+    def add_file(self, session_id, kind, path, render_ms=None):
+        """Records a file made from a whole session (e.g. its photo strip, 'kind' = layout)."""
+        self._write(
+            "INSERT OR REPLACE INTO files (session_id, kind, path, created_at, render_ms) VALUES (?, ?, ?, ?, ?)",
+            (session_id, kind, path, time.time(), render_ms),
+        )
+
+    # --- Queries ---
+
+    def _query(self, sql, params=()):
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    def recent_sessions(self, count=10, status="complete"):
+        """The last 'count' sessions (newest first) with a given status (None for any)."""
+        if status is None:
+            return self._query("SELECT * FROM sessions ORDER BY started_at DESC LIMIT ?", (count,))
+        return self._query(
+            "SELECT * FROM sessions WHERE status = ? ORDER BY started_at DESC LIMIT ?", (status, count)
+        )
+
+    def session_photos(self, session_id):
+        """Saved photos of a session in shot order."""
+        return self._query(
+            "SELECT * FROM photos WHERE session_id = ? AND saved_at IS NOT NULL ORDER BY shot", (session_id,)
+        )
+
+    def photos_since(self, timestamp, limit=None):
+        """Saved photos captured after 'timestamp' (epoch seconds), oldest first."""
+        return self._query(
+            "SELECT * FROM photos WHERE captured_at > ? AND saved_at IS NOT NULL ORDER BY captured_at LIMIT ?",
+            (timestamp, -1 if limit is None else limit),
+        )
+
+    def recent_photos(self, count):
+        """The last 'count' saved photos, newest first."""
+        return self._query(
+            "SELECT * FROM photos WHERE saved_at IS NOT NULL ORDER BY captured_at DESC LIMIT ?", (count,)
+        )
+
+    def renditions(self, photo_id):
+        """{rendition name: path} recorded for a photo."""
+        rows = self._query("SELECT name, path FROM renditions WHERE photo_id = ?", (photo_id,))
+        return {row["name"]: row["path"] for row in rows}
+
+    def session_files(self, session_id):
+        """{kind: path} of the files recorded for a session."""
+        rows = self._query("SELECT kind, path FROM files WHERE session_id = ?", (session_id,))
+        return {row["kind"]: row["path"] for row in rows}
+
+    def stats(self):
+        """Session and photo counts plus average timings (ms)."""
+        row = self._connection().execute(
+            "SELECT (SELECT COUNT(*) FROM sessions), COUNT(*), AVG(capture_ms), AVG(save_ms) FROM photos"
+        ).fetchone()
+        return dict(zip(("sessions", "photos", "capture_ms", "save_ms"), row))
+
+
+# Global factory (used from the gallery thread too, so only one store gets created)
+_store = None
+_store_lock = threading.Lock()
+
+def get_photo_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PhotoStore()
+        return _store
@@ -0,0 +1,270 @@
+import os
+import queue
+import threading
+import time
+from utils.logger import get_logger
+
+logger = get_logger("PhotoWriter")
+
+
+class PhotoJob:
+    """A photo waiting to be (or being) written. Poll 'done' or wait() for the result."""
+
+    def __init__(self, image, path, quality, on_done, color_lut=None):
+        self.image = image
+        self.path = path
+        self.quality = quality
+        self.on_done = on_done
+        self.color_lut = color_lut # Look applied before encoding (see ColorLUT)
+        self.error = None # Exception of the last attempt if the write failed
+        self.attempts = 0
+        self.size = image.size
+        # Memory held while queued (applying a look needs a second copy)
+        self.nbytes = image.width * image.height * len(image.getbands()) * (1 if color_lut is None else 2)
+        self.write_ms = None # Duration of the successful attempt
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def ok(self):
+        return self.done and self.error is None
+
+    def wait(self, timeout=None):
+        """Blocks until the job finished. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+
+class PhotoWriter:
+    """
+    Encodes and writes photos on background threads, so a slow SD card never
+    stalls the render loop. A color filter look given with a photo is applied
+    there too, at full resolution.
+
+    Files are written to a temporary name next to the target and renamed once
+    complete (optionally fsync'ed first), so a crash or power loss leaves either
+    the whole photo or nothing, never a half-written JPEG. Failed writes are
+    retried; the image stays in memory until it is on disk.
+
+    With a 'storage' (see PhotoStorage) photos are written to its RAM staging
+    area instead and moved to their path later; read them with open_photo().
+
+    The queue is bounded by the memory of its images ('max_queue_bytes'),
+    not by blocking: submit() never waits for the disk. A photo that doesn't
+    fit while others are still queued fails right away instead (see submit()).
+    """
+
+    TEMP_SUFFIX = ".part"
+    RETRIES = 3
+    RETRY_DELAY = 0.5 # Seconds, doubled per attempt
+
+    def __init__(self, max_queue_bytes=384 * 2**20, workers=2, fsync=True, storage=None):
+        self.fsync = fsync
+        self.storage = storage
+        self.max_queue_bytes = max_queue_bytes
+        self._queue = queue.Queue()
+        self._queued_bytes = 0
+        self._created_dirs = set()
+        self._dirs_lock = threading.Lock()
+        self._in_flight = 0
+        self._count_lock = threading.Lock()
+
+        self.written = 0
+        self.failed = 0
+
+        self._workers = [
+            threading.Thread(target=self._run, name=f"PhotoWriter-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def depth(self):
+        """Photos queued or being written."""
+        with self._count_lock:
+            return self._in_flight
+
+    @property
+    def queued_bytes(self):
+        """Memory of the images queued or being written."""
+        with self._count_lock:
+            return self._queued_bytes
+
+    def submit(self, image, path, quality=95, on_done=None, color_lut=None):
+        """
+        Queues a PIL image to be saved as JPEG at 'path' (with the look of
+        'color_lut' applied, if given). Returns its PhotoJob.
+        'on_done(job)' is called on the writer thread once the job finished.
+
+        Never blocks: if the image doesn't fit in 'max_queue_bytes' next to
+        the photos still waiting for the disk, the job fails immediately
+        (keeping its image, so it can be resubmitted) and 'on_done' is
+        called on the caller's thread. A single photo is always accepted.
+        """
+        job = PhotoJob(image, path, quality, on_done, color_lut)
+        with self._count_lock:
+            full = self._in_flight > 0 and self._queued_bytes + job.nbytes > self.max_queue_bytes
+            if not full:
+                self._in_flight += 1
+                self._queued_bytes += job.nbytes
+        if full:
+            job.error = RuntimeError(
+                f"Photo queue full ({self.depth} photos, {self.queued_bytes / 2**20:.0f} MB waiting for the disk)"
+            )
+            self.failed += 1
+            logger.error(f"Not saving '{path}': {job.error}")
+            self._finish(job)
+            return job
+        self._queue.put(job)
+        return job
+
+    def locate(self, path):
+        """Where a saved photo currently is (its staged copy until flushed)."""
+        return self.storage.locate(path) if self.storage else path
+
+    def open_photo(self, path):
+        """Opens a saved photo for reading, staged or not (binary file object)."""
+        return self.storage.open(path) if self.storage else open(path, "rb")
+
+    def exists(self, path):
+        """Whether a photo was saved (staged or on the target)."""
+        return self.storage.exists(path) if self.storage else os.path.exists(path)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            try:
+                self._process(job)
+            finally:
+                with self._count_lock:
+                    self._in_flight -= 1
+                    self._queued_bytes -= job.nbytes
+                self._queue.task_done()
+
+    def _process(self, job):
+        if job.color_lut is not None:
+            try:
+                job.image = job.color_lut.apply(job.image)
+            except Exception as e:
+                logger.error(f"Color filter failed for '{job.path}', saving it unfiltered: {e}")
+            job.color_lut = None # Applied once, not again on retries
+
+        delay = self.RETRY_DELAY
+        while True:
+            job.attempts += 1
+            start = time.perf_counter()
+            try:
+                self._write(job)
+                job.error = None
+                break
+            except Exception as e:
+                job.error = e
+                if job.attempts > self.RETRIES:
+                    logger.error(f"Failed to save '{job.path}' after {job.attempts} attempts: {e}")
+                    break
+                logger.warn(f"Saving '{job.path}' failed ({e}), retrying in {delay:.1f}s.")
+                time.sleep(delay)
+                delay *= 2
+
+        if job.error is None:
+            self.written += 1
+            job.write_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"Photo saved to {job.path} ({job.write_ms:.0f} ms)")
+            job.image = None # A failed job keeps its image so it can be resubmitted
+        else:
+            self.failed += 1
+        self._finish(job)
+
+    def _finish(self, job):
+        job._done.set()
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logger.error(f"Photo callback for '{job.path}' failed: {e}")
+
+    def _ensure_dir(self, directory):
+        with self._dirs_lock:
+            if directory in self._created_dirs:
+                return
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+    def _write(self, job):
+        storage = self.storage
+        path = storage.reserve(job.path) if storage else job.path
+        # Syncing RAM staging is pointless, the storage syncs when it flushes
+        fsync = self.fsync and path == job.path
+        directory = os.path.dirname(path) or "."
+
+        temp_path = path + self.TEMP_SUFFIX
+        try:
+            self._ensure_dir(directory)
+            with open(temp_path, "wb") as f:
+                job.image.save(f, "JPEG", quality=job.quality)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            if storage:
+                storage.abort(job.path, path)
+            raise
+
+        if storage:
+            storage.commit(job.path, path)
+
+        if fsync:
+            # Persist the rename itself
+            try:
+                dir_fd = os.open(directory, os.O_RDONLY)
+            except OSError:
+                return
+            try:
+                os.fsync(dir_fd)
+            except OSError:
+                pass
+            finally:
+                os.close(dir_fd)
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every submitted photo is written. Returns False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.depth:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Writes the remaining photos and stops the workers."""
+        pending = self.depth
+        if pending:
+            logger.info(f"Writing {pending} remaining photos...")
+        if not self.wait_idle(timeout):
+            logger.error(f"{self.depth} photos were not written before shutdown.")
+            return
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+
+
+# Global factory
+_writer = None
+
+def get_photo_writer():
+    global _writer
+    if _writer is None:
+        _writer = PhotoWriter()
+    return _writer
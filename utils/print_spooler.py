@@ -0,0 +1,367 @@
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+from PIL import Image, ImageOps
+from utils.logger import get_logger
+
+logger = get_logger("PrintSpooler")
+
+# Pages whose aspect ratio is this close to the paper's are cropped to fill it
+# (printer bleed), others are fitted with white borders (e.g. a 2x6" strip)
+FILL_TOLERANCE = 0.05
+
+
+def rasterize_page(source, output_path, size, dpi, quality=95):
+    """Renders 'source' (an image file) at exactly 'size' pixels for the printer."""
+    image = ImageOps.exif_transpose(Image.open(source)).convert("RGB")
+    # Landscape pages go onto portrait paper sideways, and vice versa
+    if (image.width > image.height) != (size[0] > size[1]):
+        image = image.transpose(Image.ROTATE_90)
+
+    source_ratio = image.width / image.height
+    page_ratio = size[0] / size[1]
+    if abs(source_ratio / page_ratio - 1) <= FILL_TOLERANCE:
+        page = ImageOps.fit(image, size, Image.LANCZOS)
+    else:
+        page = ImageOps.pad(image, size, Image.LANCZOS, color=(255, 255, 255))
+
+    temp_path = output_path + ".part"
+    page.save(temp_path, "JPEG", quality=quality, dpi=(dpi, dpi), subsampling=0)
+    os.replace(temp_path, output_path)
+
+
+class PrintJob:
+    """A page in the print queue. Poll 'status' (or wait()); PrintSpooler.eta() estimates when it's out."""
+
+    QUEUED = "queued"
+    RASTERIZING = "rasterizing"
+    READY = "ready" # Rasterized, waiting for the printer
+    PRINTING = "printing"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, job_id, source, copies, session_id, on_done):
+        self.id = job_id
+        self.source = source
+        self.copies = copies
+        self.session_id = session_id
+        self.on_done = on_done
+        self.status = self.QUEUED
+        self.raster_path = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None # When the printer got it
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def ok(self):
+        return self.status == self.DONE
+
+    def wait(self, timeout=None):
+        """Blocks until the job is printed or failed. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+
+class PrintSpooler:
+    """
+    Queues pages for a printer backend (see printers/) and keeps it busy.
+
+    Jobs go through two stages on their own threads: rasterizing (scaled,
+    rotated and cropped to the printer's page pixels, then written to the
+    spool directory) and printing. Pages are rasterized while the printer is
+    still busy with earlier ones, so each page is sent the moment the
+    previous one is finished. submit() never blocks the booth.
+
+    ETAs come from the measured print time per page (moving average, starting
+    from the backend's estimate). Pages wait while the printer reports it is
+    not ready (e.g. out of paper). Pages the printer did not take are retried;
+    once it took one, a failure is final, as sending it again could print it
+    twice.
+    """
+
+    RETRIES = 3
+    RETRY_DELAY = 5.0 # Seconds, doubled per attempt
+    READY_POLL = 5.0 # Seconds between checks of a printer that is not ready
+    READY_TIMEOUT = 600.0 # Seconds a page waits for the printer to become ready
+    SMOOTHING = 0.3 # Weight of the newest measurement in the averages
+
+    def __init__(self, printer=None, spool_dir=None, copies=1):
+        self.printer = printer
+        self.copies = copies # Default per job
+        self.spool_dir = spool_dir or os.path.join(tempfile.gettempdir(), "photobooth-spool")
+        self._ids = itertools.count(1)
+        self._jobs = [] # Unfinished jobs in submission order
+        self._lock = threading.Lock()
+        self._busy_printer = None # Backend printing a page right now
+        self._retired_printer = None # Replaced while busy, shut down after its page
+        self._raster_queue = queue.Queue()
+        self._print_queue = queue.Queue()
+        self.seconds_per_page = None # Measured, see eta()
+        self.raster_seconds = 1.0
+        self.printed = 0
+        self.failed = 0
+
+        self._threads = [
+            threading.Thread(target=self._run_rasterizer, name="PrintRasterizer", daemon=True),
+            threading.Thread(target=self._run_printer, name="PrintSpooler", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def enabled(self):
+        return self.printer is not None
+
+    @property
+    def depth(self):
+        """Jobs not printed yet (including the one printing)."""
+        with self._lock:
+            return len(self._jobs)
+
+    def set_printer(self, printer):
+        """Switches the backend (None: off). A busy one is shut down once its page is out."""
+        with self._lock:
+            old = self.printer
+            self.printer = printer
+            if old is not None and old is self._busy_printer:
+                self._retired_printer, old = old, None
+        if old is not None:
+            old.shut_down()
+
+    def submit(self, source, copies=None, session_id=None, on_done=None):
+        """
+        Queues an image file to be printed. Returns its PrintJob, or None
+        without a printer. 'on_done(job)' is called on the spooler thread.
+        """
+        if self.printer is None:
+            return None
+        copies = self.copies if copies is None else copies
+        job = PrintJob(next(self._ids), source, max(1, int(copies)), session_id, on_done)
+        with self._lock:
+            self._jobs.append(job)
+            position = len(self._jobs)
+        self._raster_queue.put(job)
+        logger.info(f"Print job {job.id} queued ({position} in queue, ETA {self.eta(job):.0f} s): {source}")
+        return job
+
+    def _page_seconds(self):
+        if self.seconds_per_page is not None:
+            return self.seconds_per_page
+        return self.printer.seconds_per_page if self.printer else 0.0
+
+    def eta(self, job):
+        """Estimated seconds until 'job' is printed (0 once finished)."""
+        now = time.time()
+        page_seconds = self._page_seconds()
+        with self._lock:
+            if job not in self._jobs:
+                return 0.0
+            ahead = self._jobs[:self._jobs.index(job) + 1]
+
+        printing = 0.0 # Printer time for the jobs up to and including 'job'
+        rasterizing = 0.0 # Rasterizer time until 'job' is ready
+        for other in ahead:
+            pages = page_seconds * other.copies
+            if other.status == PrintJob.PRINTING:
+                printing += max(0.0, pages - (now - other.started_at))
+            else:
+                printing += pages
+            if other.status in (PrintJob.QUEUED, PrintJob.RASTERIZING):
+                rasterizing += self.raster_seconds
+        # The job can't start before it is rasterized, nor before the printer is free
+        return max(printing - page_seconds * job.copies, rasterizing) + page_seconds * job.copies
+
+    def jobs(self):
+        """[(job, status, eta seconds)] of the unfinished jobs, in queue order."""
+        with self._lock:
+            jobs = list(self._jobs)
+        return [(job, job.status, self.eta(job)) for job in jobs]
+
+    def _average(self, current, measured):
+        return measured if current is None else current + self.SMOOTHING * (measured - current)
+
+    def _run_rasterizer(self):
+        while True:
+            job = self._raster_queue.get()
+            if job is None:
+                self._print_queue.put(None)
+                return
+            printer = self.printer
+            if printer is None:
+                self._finish(job, RuntimeError("No printer"))
+                continue
+
+            job.status = PrintJob.RASTERIZING
+            start = time.perf_counter()
+            try:
+                os.makedirs(self.spool_dir, exist_ok=True)
+                job.raster_path = os.path.join(self.spool_dir, f"job-{job.id}.jpg")
+                rasterize_page(job.source, job.raster_path, printer.page_pixels, printer.dpi)
+            except Exception as e:
+                logger.error(f"Failed to rasterize print job {job.id} ('{job.source}'): {e}")
+                self._finish(job, e)
+                continue
+            self.raster_seconds = self._average(self.raster_seconds, time.perf_counter() - start)
+            job.status = PrintJob.READY
+            self._print_queue.put(job)
+
+    def _run_printer(self):
+        while True:
+            job = self._print_queue.get()
+            if job is None:
+                return
+            self._print(job)
+
+    def _ready_printer(self, job):
+        """The printer once it reports ready (None without one). Raises if it stays unready."""
+        deadline = time.monotonic() + self.READY_TIMEOUT
+        warned = False
+        while True:
+            printer = self.printer
+            if printer is None:
+                return None
+            try:
+                ready = printer.is_ready()
+            except Exception as e:
+                logger.warn(f"Could not check printer '{printer.name}': {e}")
+                ready = False
+            if ready:
+                return printer
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Printer '{printer.name}' not ready for {self.READY_TIMEOUT:.0f} s")
+            if not warned:
+                logger.warn(f"Printer '{printer.name}' not ready, holding print job {job.id}.")
+                warned = True
+            time.sleep(self.READY_POLL)
+
+    def _print(self, job):
+        delay = self.RETRY_DELAY
+        error = None
+        for attempt in range(1, self.RETRIES + 1):
+            try:
+                printer = self._ready_printer(job)
+            except RuntimeError as e:
+                error = e
+                break
+            if printer is None:
+                error = RuntimeError("No printer")
+                break
+            with self._lock:
+                self._busy_printer = printer
+            job.status = PrintJob.PRINTING
+            job.started_at = time.time()
+            start = time.perf_counter()
+            try:
+                try:
+                    handle = printer.submit_page(job.raster_path, job.copies)
+                except Exception as e:
+                    # Not taken by the printer, safe to send again
+                    error = e
+                    logger.warn(f"Print job {job.id} failed (attempt {attempt}/{self.RETRIES}): {e}")
+                    job.status = PrintJob.READY
+                    if attempt < self.RETRIES:
+                        time.sleep(delay)
+                        delay *= 2
+                    continue
+                try:
+                    printer.wait_page(handle)
+                except Exception as e:
+                    # The printer has the page, not resent
+                    error = e
+                    break
+                error = None
+                self.seconds_per_page = self._average(
+                    self.seconds_per_page, (time.perf_counter() - start) / job.copies
+                )
+                break
+            finally:
+                self._release_printer()
+        self._finish(job, error)
+
+    def _release_printer(self):
+        with self._lock:
+            self._busy_printer = None
+            retired, self._retired_printer = self._retired_printer, None
+        if retired is not None:
+            retired.shut_down()
+
+    def _finish(self, job, error):
+        job.error = error
+        job.status = PrintJob.FAILED if error else PrintJob.DONE
+        job.finished_at = time.time()
+        if error:
+            self.failed += 1
+            logger.error(f"Print job {job.id} given up: {error}")
+        else:
+            self.printed += 1
+            logger.info(f"Print job {job.id} printed in {job.finished_at - job.submitted_at:.0f} s.")
+        if job.raster_path:
+            try:
+                os.remove(job.raster_path)
+            except OSError:
+                pass
+        with self._lock:
+            if job in self._jobs:
+                self._jobs.remove(job)
+        job._done.set()
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logger.error(f"Print callback for job {job.id} failed: {e}")
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every submitted job is printed or failed. Returns False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.depth:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Prints the queued jobs (up to 'timeout') and stops the threads."""
+        pending = self.depth
+        if pending:
+            logger.info(f"Waiting for {pending} print jobs...")
+        if not self.wait_idle(timeout):
+            for job, status, _ in self.jobs():
+                logger.error(f"Print job {job.id} ({status}) not printed before shutdown: {job.source}")
+            return
+        self._raster_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        if self.printer:
+            self.printer.shut_down()
+
+
+def create_printer(settings):
+    """Creates the print backend configured in the settings, or None if printing is off."""
+    printer_type = settings.get("printer_type", "")
+    if printer_type == "file":
+        from printers.file_sink_printer import FileSinkPrinter
+        return FileSinkPrinter(settings.get("print_dir", "prints"))
+    if printer_type == "cups":
+        from printers.cups_printer import CupsPrinter
+        return CupsPrinter(settings.get("printer_name") or None)
+    if printer_type:
+        logger.warn(f"Unknown printer type {printer_type}, printing disabled.")
+    return None
+
+
+# Global factory
+_spooler = None
+
+def get_print_spooler():
+    global _spooler
+    if _spooler is None:
+        _spooler = PrintSpooler()
+    return _spooler
@@ -0,0 +1,173 @@
+import time
+from utils.logger import get_logger
+
+logger = get_logger("QualityGovernor")
+
+
+class QualityGovernor:
+    """
+    Adapts rendering quality to the measured frame times.
+
+    Quality is a level from 0 (full quality) to len(LEVERS). Each level moves one
+    more lever from its full-quality value to its limit, least noticeable first.
+    The level drops as soon as an evaluation window misses too many deadlines and
+    only recovers after a longer period with headroom (hysteresis). An upgrade
+    that leads straight back to a downgrade doubles the wait for the next one.
+
+    Limits come from the 'quality_min_*' settings. Consumers read the current
+    lever values with get() or subscribe with add_listener(). A lever that
+    saves nothing in the current setup (see set_lever_active()) is skipped:
+    it stays at full quality and the levels step over it.
+    """
+
+    # (lever, full quality value, setting holding its limit), in degradation order
+    LEVERS = (
+        ("preview_fps", 30, "quality_min_preview_fps"), # Live view uploads per second
+        ("orbit_polaroids", 20, "quality_min_orbit_polaroids"), # Polaroids on the MainScreen orbit
+        ("preview_scale", 1.0, "quality_min_preview_scale"), # Live view decode scale
+        ("frame_rate", 60, "quality_min_frame_rate"), # Animation frame rate cap
+        ("render_scale", 1.0, "quality_min_render_scale"), # See ScaledCanvas
+    )
+
+    WINDOW = 2.0 # Seconds of frames per evaluation
+    DOWNGRADE_MISS_RATIO = 0.1 # Step down if more than this fraction of frames missed
+    UPGRADE_BUSY_RATIO = 0.5 # Step up only if frames use less than this fraction of their budget
+    UPGRADE_DELAY = 10.0 # Seconds of headroom needed before stepping up
+    MAX_UPGRADE_DELAY = 120.0
+
+    def __init__(self):
+        self.enabled = True
+        self.full = {name: full for name, full, _ in self.LEVERS}
+        self.limits = dict(self.full)
+        self.values = dict(self.full)
+        self.inactive = set() # Levers left at full quality, see set_lever_active()
+        self.level = 0
+        self.listeners = []
+
+        self.upgrade_delay = self.UPGRADE_DELAY
+        self._last_upgrade = None
+        self._headroom_since = None
+        self._reset_window()
+
+    @property
+    def max_level(self):
+        return len(self.LEVERS) - len(self.inactive)
+
+    def set_lever_active(self, name, active):
+        """
+        Includes or skips a lever, e.g. one whose consumer currently gains
+        nothing per frame from it. The current level is re-applied.
+        """
+        if active == (name not in self.inactive):
+            return
+        if active:
+            self.inactive.discard(name)
+        else:
+            self.inactive.add(name)
+        logger.info(f"Lever {name} {'enabled' if active else 'skipped'}.")
+        self.set_level(self.level, f"{name} {'enabled' if active else 'skipped'}")
+
+    def configure(self, settings, frame_rate=None):
+        """Reads the limits from the settings. 'frame_rate' is the full-quality frame rate."""
+        self.enabled = bool(settings.get("quality_governor", True))
+        if frame_rate:
+            self.full["frame_rate"] = int(frame_rate)
+        self.full["render_scale"] = float(settings.get("render_scale", 1.0))
+
+        for name, full, key in self.LEVERS:
+            try:
+                limit = type(full)(settings.get(key, self.full[name]))
+            except (TypeError, ValueError):
+                logger.warn(f"Invalid value for setting '{key}', not lowering {name}.")
+                limit = self.full[name]
+            # Limits can only lower quality
+            self.limits[name] = min(limit, self.full[name])
+
+        self.set_level(self.level if self.enabled else 0, "configured")
+
+    def get(self, name):
+        """Current value of a lever."""
+        return self.values[name]
+
+    def add_listener(self, callback):
+        """Registers callback(governor), called whenever the lever values change."""
+        self.listeners.append(callback)
+
+    def set_level(self, level, reason):
+        """Applies a quality level and notifies the listeners."""
+        level = max(0, min(self.max_level, level))
+        active = [name for name, _, _ in self.LEVERS if name not in self.inactive]
+        lowered = set(active[:level])
+        values = {
+            name: self.limits[name] if name in lowered else self.full[name]
+            for name, _, _ in self.LEVERS
+        }
+        changed = values != self.values
+        if level != self.level:
+            summary = ", ".join(f"{name}={value}" for name, value in values.items())
+            logger.info(f"Quality level {self.level} -> {level} ({reason}): {summary}")
+        self.level = level
+        self.values = values
+
+        if changed:
+            for callback in self.listeners:
+                callback(self)
+
+    def _reset_window(self):
+        self._window_start = time.perf_counter()
+        self._frames = 0
+        self._missed = 0
+        self._busy_ratios = []
+
+    def observe(self, missed, busy_ratio):
+        """
+        Feeds one presented frame: whether it missed its deadline and the
+        fraction of its budget spent on events, update and draw.
+        """
+        if not self.enabled:
+            return
+
+        self._frames += 1
+        self._missed += bool(missed)
+        self._busy_ratios.append(busy_ratio)
+
+        now = time.perf_counter()
+        if now - self._window_start >= self.WINDOW:
+            self._evaluate(now)
+            self._reset_window()
+
+    def _evaluate(self, now):
+        miss_ratio = self._missed / self._frames
+        busy = sorted(self._busy_ratios)[int(0.9 * (len(self._busy_ratios) - 1))]
+
+        if miss_ratio > self.DOWNGRADE_MISS_RATIO:
+            self._headroom_since = None
+            if self.level < self.max_level:
+                if self._last_upgrade is not None and now - self._last_upgrade < 2 * self.WINDOW:
+                    # The last upgrade didn't hold, wait longer before retrying
+                    self.upgrade_delay = min(self.MAX_UPGRADE_DELAY, self.upgrade_delay * 2)
+                self.set_level(self.level + 1, f"{miss_ratio:.0%} of frames missed")
+            return
+
+        if self._missed or busy >= self.UPGRADE_BUSY_RATIO:
+            self._headroom_since = None
+            return
+
+        if self._headroom_since is None:
+            self._headroom_since = now
+        elif self.level > 0 and now - self._headroom_since >= self.upgrade_delay:
+            self._headroom_since = now
+            self._last_upgrade = now
+            self.set_level(self.level - 1, f"p90 frame load {busy:.0%}")
+            if self.level == 0:
+                self.upgrade_delay = self.UPGRADE_DELAY
+
+
+# Global factory
+_governor = None
+
+def get_quality_governor():
+    global _governor
+    if _governor is None:
+        _governor = QualityGovernor()
+    return _governor
@@ -0,0 +1,162 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from utils.logger import get_logger
+from utils.photo_writer import get_photo_writer
+
+logger = get_logger("RenditionPipeline")
+
+# Rendition name -> longest side in pixels, smallest first
+RENDITIONS = {
+    "thumb": 320, # Gallery and orbit polaroids
+    "polaroid": 800, # Capture polaroid (500 px at 1280 wide, 750 px at 1920)
+    "screen": 1920, # Full screen review
+}
+RENDITION_DIR = "renditions" # Next to the photo
+
+
+def rendition_path(photo_path, name):
+    """Where the 'name' rendition of a photo is stored: renditions/<stem>.<name>.jpg next to it."""
+    directory, filename = os.path.split(photo_path)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, RENDITION_DIR, f"{stem}.{name}.jpg")
+
+
+def nearest_rendition(available, size):
+    """
+    From {rendition name: path}, the path of the smallest rendition whose
+    longest side covers 'size' ((width, height) or one side), else the largest
+    one. None if 'available' is empty.
+    """
+    wanted = max(size) if isinstance(size, (tuple, list)) else size
+    fallback = None
+    for name, side in sorted(RENDITIONS.items(), key=lambda item: item[1]):
+        if name not in available:
+            continue
+        if side >= wanted:
+            return available[name]
+        fallback = available[name]
+    return fallback
+
+
+class RenditionPipeline:
+    """
+    Produces the fixed set of smaller versions (RENDITIONS) of each captured
+    photo in one pass on a worker pool, so consumers never decode and scale
+    the full 24 MP original.
+
+    JPEG files are decoded with PIL's draft mode, which lets libjpeg scale by
+    1/2, 1/4 or 1/8 in the DCT domain, i.e. the full resolution is never
+    materialized. Every rendition is resized from the next larger one. Photos
+    still in memory after capture are used directly. Files are written (and
+    staged) through the PhotoWriter.
+
+    nearest() returns the smallest rendition that covers a requested size.
+    """
+
+    QUALITY = 85
+
+    def __init__(self, renditions=RENDITIONS, max_workers=2):
+        self.renditions = sorted(renditions.items(), key=lambda item: item[1])
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._known = {} # photo path -> {rendition name: path} written this run
+
+    def submit(self, photo_path, image=None, on_done=None, color_lut=None):
+        """
+        Queues the renditions of a photo. 'image' is the decoded photo if it is
+        still in memory (it is not modified); 'color_lut' the look to apply if
+        that image doesn't have it yet. Returns a Future of {name: path};
+        'on_done(photo_path, renditions)' is called once they are all written.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="Rendition")
+        return self._executor.submit(self._render, photo_path, image, on_done, color_lut)
+
+    def _open(self, photo_path):
+        largest = self.renditions[-1][1]
+        with get_photo_writer().open_photo(photo_path) as f:
+            image = Image.open(f)
+            # DCT-domain downscale to the smallest size still covering the largest rendition
+            image.draft("RGB", (largest, largest))
+            image.load()
+        return image
+
+    def _render(self, photo_path, image, on_done, color_lut=None):
+        try:
+            source = image if image is not None else self._open(photo_path)
+            source = source.convert("RGB") if source.mode != "RGB" else source
+
+            jobs = {}
+            writer = get_photo_writer()
+            # Largest first, each one is scaled from the previous (cheaper and sharp enough)
+            for name, side in reversed(self.renditions):
+                if max(source.size) > side:
+                    resized = source.copy()
+                    resized.thumbnail((side, side), Image.LANCZOS, reducing_gap=2.0)
+                    source = resized
+                if color_lut is not None:
+                    # On the largest rendition rather than the full resolution, the smaller ones inherit it
+                    source = color_lut.apply(source)
+                    color_lut = None
+                jobs[name] = writer.submit(source, rendition_path(photo_path, name), self.QUALITY)
+        except Exception as e:
+            logger.error(f"Failed to create renditions of '{photo_path}': {e}")
+            raise
+
+        paths = {}
+        for name, job in jobs.items():
+            job.wait()
+            if job.ok:
+                paths[name] = job.path
+        with self._lock:
+            self._known[os.path.normpath(photo_path)] = paths
+
+        if on_done:
+            try:
+                on_done(photo_path, paths)
+            except Exception as e:
+                logger.error(f"Rendition callback for '{photo_path}' failed: {e}")
+        return paths
+
+    def available(self, photo_path):
+        """{rendition name: path} of the renditions that exist for a photo."""
+        with self._lock:
+            known = self._known.get(os.path.normpath(photo_path))
+        if known is not None:
+            return known
+
+        # Photos from earlier runs: look on disk
+        found = {}
+        for name, _ in self.renditions:
+            path = rendition_path(photo_path, name)
+            if get_photo_writer().exists(path):
+                found[name] = path
+        return found
+
+    def nearest(self, photo_path, size):
+        """
+        Path of the smallest rendition whose longest side covers 'size'
+        ((width, height) or a single side), else the largest rendition, else
+        the original. The photo may still be staged, read it with
+        PhotoWriter.open_photo().
+        """
+        return nearest_rendition(self.available(photo_path), size) or photo_path
+
+    def shutdown(self, wait=True):
+        """Finishes the queued photos (if 'wait') and stops the workers."""
+        if self._executor:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+# Global factory
+_pipeline = None
+
+def get_rendition_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = RenditionPipeline()
+    return _pipeline
@@ -8,7 +8,32 @@ logger = get_logger("SettingsManager")
 DEFAULT_SETTINGS = {
     "camera_type": "webcam", # Options: 'webcam', 'dslr'
     "camera_index": 0,
-    "screen_size": "1280x800" # Options: "1280x800", "1024x600"
+    "screen_size": "1280x800", # Options: "1280x800", "1024x600"
+    "orbit_mode": "ring", # Options: "ring" (one baked texture), "individual"
+    "live_gallery": True, # Show the latest captures on the MainScreen orbit
+    "color_filter": "", # Look of preview and photos: "" (none), "bw", "vintage", "high_contrast"
+    "render_scale": 1.0, # Fraction of the window resolution screens render at (0.25 - 1.0)
+    "texture_budget_mb": 256, # GPU texture memory before least recently drawn images are evicted
+    "photo_fsync": True, # Flush each photo to the card before it counts as saved (slower, survives power loss)
+    "photo_queue_mb": 384, # Memory of captures waiting to be written; more fail instead of stalling the booth
+    # Write-behind photo storage: stage captures in RAM, move them to the card when idle
+    "photo_staging": True,
+    "photo_staging_dir": "/dev/shm/photobooth",
+    "photo_staging_mb": 512,
+    "photo_flush_idle_s": 15.0,
+    "photo_strip_layout": "strip_pair", # Print page per session: "strip", "strip_pair", "grid" or "" (off)
+    # Printing of the session pages
+    "printer_type": "", # Options: "" (off), "file" (writes pages to print_dir), "cups"
+    "printer_name": "", # CUPS queue, empty for the default printer
+    "print_dir": "prints",
+    "print_copies": 1,
+    # Quality governor: lowest values it may step down to when frames run long
+    "quality_governor": True,
+    "quality_min_preview_fps": 10,
+    "quality_min_orbit_polaroids": 10,
+    "quality_min_preview_scale": 0.5,
+    "quality_min_frame_rate": 30,
+    "quality_min_render_scale": 0.5
 }
 
 class SettingsManager:
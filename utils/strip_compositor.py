@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image, ImageOps
+from utils.logger import get_logger
+from utils.photo_storage import open_located
+from utils.photo_store import get_photo_store
+from utils.photo_writer import get_photo_writer
+
+logger = get_logger("StripCompositor")
+
+DPI = 300
+LOGO_PATH = "assets/images/logo-loomo.png"
+
+
+def _strip_boxes(x):
+    """Photo and logo boxes (inches) of a 2x6" strip whose left edge is at 'x'."""
+    photos = [(shot, (x + 0.1, 0.1 + shot * 1.45, 1.8, 1.35)) for shot in range(3)]
+    logos = [(x + 0.1, 4.45, 1.8, 1.45)]
+    return photos, logos
+
+
+# Layout name -> page size, photo boxes (shot index, box) and logo boxes; boxes are
+# (x, y, width, height) in inches. The logo is white, so pages are dark.
+LAYOUTS = {
+    # Classic 2x6" strip, three photos above the logo
+    "strip": {
+        "size": (2, 6),
+        "photos": _strip_boxes(0)[0],
+        "logos": _strip_boxes(0)[1],
+    },
+    # Two identical strips on a 4x6" print, cut in half after printing
+    "strip_pair": {
+        "size": (4, 6),
+        "photos": _strip_boxes(0)[0] + _strip_boxes(2)[0],
+        "logos": _strip_boxes(0)[1] + _strip_boxes(2)[1],
+    },
+    # 4x6" print, 2x2 grid with the logo in the last cell
+    "grid": {
+        "size": (4, 6),
+        "photos": [
+            (0, (0.1, 0.1, 1.85, 2.85)),
+            (1, (2.05, 0.1, 1.85, 2.85)),
+            (2, (0.1, 3.05, 1.85, 2.85)),
+        ],
+        "logos": [(2.05, 3.05, 1.85, 2.85)],
+    },
+}
+BACKGROUND = (24, 24, 24)
+
+
+def _pixels(box):
+    return tuple(int(round(v * DPI)) for v in box)
+
+
+def _open_photo(located, path, size):
+    """Opens a photo, decoded (JPEG draft) no larger than needed to cover 'size'."""
+    with open_located(located, path) as f:
+        image = Image.open(f)
+        image.draft("RGB", size)
+        return ImageOps.exif_transpose(image).convert("RGB")
+
+
+def render_layout(photos, output_path, layout, logo_path=LOGO_PATH, quality=95):
+    """
+    Renders a print-ready page (see LAYOUTS) and writes it to 'output_path'.
+    'photos' lists, per shot, (current location, final path) as from
+    PhotoWriter.locate(), see open_located(). Runs in a worker process; returns the render time in ms.
+    """
+    start = time.perf_counter()
+    spec = LAYOUTS[layout]
+    page_w, page_h = _pixels(spec["size"])
+    page = Image.new("RGB", (page_w, page_h), BACKGROUND)
+
+    # Each shot is decoded once, even when it appears in several boxes
+    decoded = {}
+    for shot, box in spec["photos"]:
+        if shot >= len(photos):
+            continue # Short session, the box stays empty
+        x, y, w, h = _pixels(box)
+        if shot not in decoded:
+            decoded[shot] = _open_photo(*photos[shot], (w, h))
+        page.paste(ImageOps.fit(decoded[shot], (w, h), Image.LANCZOS), (x, y))
+
+    if logo_path and spec["logos"]:
+        logo = Image.open(logo_path).convert("RGBA")
+        for box in spec["logos"]:
+            x, y, w, h = _pixels(box)
+            fitted = ImageOps.contain(logo, (w, h), Image.LANCZOS)
+            page.paste(fitted, (x + (w - fitted.width) // 2, y + (h - fitted.height) // 2), fitted)
+
+    directory = os.path.dirname(output_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_path = output_path + ".part"
+    try:
+        with open(temp_path, "wb") as f:
+            page.save(f, "JPEG", quality=quality, dpi=(DPI, DPI), subsampling=0)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return (time.perf_counter() - start) * 1000
+
+
+def _init_worker():
+    # Yield to the render process when cores are contended
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+class StripCompositor:
+    """
+    Renders a print-ready strip or grid (LAYOUTS, 300 dpi) from a session's
+    full-resolution captures and the logo.
+
+    Rendering runs in a pool of worker processes, so decoding 24 MP JPEGs and
+    resampling to print resolution use spare cores without holding the render
+    process's GIL. Workers are spawned (not forked, the render process has SDL
+    and GL state) at reduced priority, on first use or start().
+
+    compose_session() waits on a dispatcher thread until the session's photos
+    are written and indexed, then hands their paths to a worker and records the
+    result in the PhotoStore ('files', kind = layout name). 'layout' None
+    disables it.
+    """
+
+    def __init__(self, layout="strip_pair", logo_path=LOGO_PATH, max_workers=None):
+        self.layout = layout
+        self.logo_path = logo_path
+        self.max_workers = max_workers or max(1, min(2, (os.cpu_count() or 2) - 1))
+        self._pool = None
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Spawns the worker processes ahead of the first session (takes a moment)."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                self._dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="StripCompositor")
+                for _ in range(self.max_workers):
+                    self._pool.submit(time.sleep, 0) # Bring the processes up now
+        return self
+
+    def output_path(self, session_id, layout):
+        return os.path.join(get_photo_store().session_dir(session_id), f"{session_id}.{layout}.jpg")
+
+    def compose(self, photo_paths, output_path, layout=None):
+        """
+        Renders 'photo_paths' (in shot order) into 'output_path'. Returns a
+        Future of the render time in ms.
+        """
+        layout = layout or self.layout
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}'. Options: {', '.join(LAYOUTS)}")
+        self.start()
+        writer = get_photo_writer()
+        # Located here, opened in the worker (see open_located())
+        photos = [(writer.locate(path), path) for path in photo_paths]
+        return self._pool.submit(render_layout, photos, output_path, layout, self.logo_path)
+
+    def compose_session(self, session_id, layout=None, on_done=None):
+        """
+        Queues the page of a finished session. Returns a Future of its path
+        (None if disabled); 'on_done(session_id, path)' is called once written.
+        """
+        layout = layout or self.layout
+        if not layout or session_id is None:
+            return None
+        self.start()
+        return self._dispatcher.submit(self._compose_session, session_id, layout, on_done)
+
+    def _compose_session(self, session_id, layout, on_done):
+        store = get_photo_store()
+        try:
+            # The session's last photo may still be queued for writing
+            if not get_photo_writer().wait_idle(timeout=60):
+                logger.warn(f"Photos still being written, composing session {session_id} with those saved.")
+            store.flush()
+            photos = [row["path"] for row in store.session_photos(session_id)]
+            if not photos:
+                logger.warn(f"Session {session_id} has no saved photos, nothing to compose.")
+                return None
+
+            path = self.output_path(session_id, layout)
+            render_ms = self.compose(photos, path, layout).result()
+        except Exception as e:
+            logger.error(f"Failed to compose session {session_id} ({layout}): {e}")
+            raise
+
+        store.add_file(session_id, layout, path, render_ms)
+        logger.info(f"Composed {layout} of session {session_id} ({len(photos)} photos, {render_ms:.0f} ms): {path}")
+        if on_done:
+            try:
+                on_done(session_id, path)
+            except Exception as e:
+                logger.error(f"Compositor callback for session {session_id} failed: {e}")
+        return path
+
+    def shutdown(self, wait=True):
+        """Finishes the queued pages (if 'wait') and stops the worker processes."""
+        # Not under the lock: queued sessions still submit to the pool
+        if self._dispatcher:
+            self._dispatcher.shutdown(wait=wait, cancel_futures=not wait)
+        with self._lock:
+            pool, self._pool, self._dispatcher = self._pool, None, None
+        if pool:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Global factory
+_compositor = None
+
+def get_strip_compositor():
+    global _compositor
+    if _compositor is None:
+        _compositor = StripCompositor()
+    return _compositor